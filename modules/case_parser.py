@@ -1,42 +1,302 @@
-import re, json, os
-import pandas as pd
+import csv, json, os, time, uuid
+from collections import deque
+
+CASE_TAG = "<사례"
+ARROW = "→"
+CHUNK_SIZE = 1 << 16
+
+# ---- 스트리밍 토크나이저 ----
+# 파일을 한 번만 읽으면서 <사례> 블록과 "조건 → 결과" 규칙을 offset(문자 단위)과 함께 내보낸다.
+# 예전 정규식과 같은 결과를 낸다:
+#   <사례.*?>.*?(?=<사례|\Z)   (DOTALL)  → 태그의 첫 '>' 이후 다음 "<사례" 직전(또는 끝)까지
+#   (.+?)\s*→\s*(.+)                      → 줄 단위, 단 화살표 앞뒤 공백은 빈 줄을 넘을 수 있음
+
+def _read(source, chunk_size=CHUNK_SIZE):
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+def _lines(chunks):
+    """(offset, 줄 내용, 개행) — 개행은 "\\n" 또는 마지막 줄이면 ""."""
+    off, tail = 0, ""
+    for chunk in chunks:
+        parts = (tail + chunk).split("\n")
+        tail = parts.pop()
+        for line in parts:
+            yield off, line, "\n"
+            off += len(line) + 1
+    yield off, tail, ""
+
+class _CaseScanner:
+    # 태그와 '>'는 한 줄 안에 있으므로 줄마다 find 한 번씩이면 된다
+    def __init__(self):
+        self.state = "seek"   # seek → header('>' 대기) → body(다음 태그 대기)
+        self.start = 0
+        self.parts = []
+
+    def feed(self, off, line, nl):
+        out, text, i = [], line + nl, 0
+        while True:
+            if self.state == "seek":
+                i = text.find(CASE_TAG, i)
+                if i < 0:
+                    return out
+                self.state, self.start, self.parts = "header", off + i, []
+                text, off, i = text[i:], off + i, len(CASE_TAG)
+            elif self.state == "header":
+                i = text.find(">", i)
+                if i < 0:
+                    break
+                self.state, i = "body", i + 1
+            else:
+                k = text.find(CASE_TAG, i)
+                if k < 0:
+                    break
+                self.parts.append(text[:k])
+                out.append(self._emit(off + k))
+                self.state, self.start, self.parts = "header", off + k, []
+                text, off, i = text[k:], off + k, len(CASE_TAG)
+        self.parts.append(text)
+        return out
+
+    def finish(self, end):
+        # '>'를 못 찾은 태그는 정규식처럼 버린다 (그 뒤 태그도 '>'가 없으므로 함께)
+        return [self._emit(end)] if self.state == "body" else []
+
+    def _emit(self, end):
+        return {"type": "사례", "content": "".join(self.parts).strip(), "start": self.start, "end": end}
+
+def _iter_rules(lines):
+    """규칙 토큰을, 규칙이 없는 줄에는 None을 내보낸다 (호출 측이 사례 토큰을 섞어 내보내도록)."""
+    ahead = deque()
+
+    def peek(k):
+        while len(ahead) <= k:
+            nxt = next(lines, None)
+            if nxt is None:
+                return None
+            ahead.append(nxt)
+        return ahead[k]
+
+    def skip_blank(k):
+        while peek(k) is not None and not ahead[k][1].strip():
+            k += 1
+        return k
+
+    while True:
+        cur = ahead.popleft() if ahead else next(lines, None)
+        if cur is None:
+            return
+        off, s, _ = cur
+        # 조건(.+?)은 한 글자 이상, 줄 안에서 첫 화살표(맨 앞 제외)까지
+        a = s.find(ARROW, 1)
+        if a > 0:
+            cond, rest, arrow_end, used = s[:a], s[a + 1:], off + len(s), 0
+        elif s:
+            # 화살표가 없으면 빈 줄 뒤 첫 내용 줄이 화살표로 시작할 때만 이어진다
+            k = skip_blank(0)
+            nxt = peek(k)
+            t = nxt[1].lstrip() if nxt is not None else ""
+            if not t.startswith(ARROW):
+                yield None
+                continue
+            cond, rest, arrow_end, used = s, t[1:], nxt[0] + len(nxt[1]), k + 1
+        else:
+            yield None
+            continue
+
+        if rest.strip():
+            res, end = rest, arrow_end
+        else:
+            # 결과는 다음 내용 줄; 끝까지 공백뿐이면 개행 아닌 공백이 하나라도 있어야 매치(빈 결과)
+            k = skip_blank(used)
+            nxt = peek(k)
+            if nxt is not None:
+                res, end, used = nxt[1], nxt[0] + len(nxt[1]), k + 1
+            else:
+                tails = [arrow_end] if rest else []
+                tails += [o + len(l) for o, l, _ in list(ahead)[used:] if l]
+                if not tails:
+                    yield None
+                    continue
+                res, end, used = "", tails[-1], k
+        for _ in range(used):
+            ahead.popleft()
+        yield {"type": "규칙", "condition": cond.strip(), "result": res.strip(), "start": off, "end": end}
+
+def iter_tokens(source, chunk_size=CHUNK_SIZE):
+    """
+    source(문자열, 텍스트 파일 객체, 문자열 청크 iterable)를 한 번 훑으며
+    {"type": "사례", "content", "start", "end"} / {"type": "규칙", "condition", "result", "start", "end"}
+    토큰을 찾는 대로 내보낸다. 각 종류 안에서는 위치 순서.
+    """
+    cases, found = _CaseScanner(), deque()
+    size = [0]
+
+    def lines():
+        for off, line, nl in _lines(_read(source, chunk_size)):
+            found.extend(cases.feed(off, line, nl))
+            size[0] = off + len(line)
+            yield off, line, nl
+        found.extend(cases.finish(size[0]))
+
+    for rule in _iter_rules(lines()):
+        while found:
+            yield found.popleft()
+        if rule is not None:
+            yield rule
+    while found:
+        yield found.popleft()
+
+def _collect(tokens):
+    cases, rules = [], []
+    for tok in tokens:
+        if tok["type"] == "사례":
+            cases.append({"id": f"case_{len(cases) + 1}", "type": "사례", "content": tok["content"]})
+        else:
+            rules.append({"id": f"rule_{len(rules) + 1}", "type": "규칙",
+                          "condition": tok["condition"], "result": tok["result"]})
+    return cases + rules
 
 def parse_cases(text: str):
     """
     텍스트에서 <사례>, 규칙, 조건/결과 패턴을 자동 추출
     """
-    results = []
-
-    # 1) <사례> 블록 추출
-    case_blocks = re.findall(r"<사례.*?>.*?(?=<사례|\Z)", text, flags=re.DOTALL)
-    for i, block in enumerate(case_blocks, 1):
-        results.append({
-            "id": f"case_{i}",
-            "type": "사례",
-            "content": block.strip()
-        })
-
-    # 2) 조건 → 결과 규칙 추출 (예: "OO하면 → XX된다")
-    rules = re.findall(r"(.+?)\s*→\s*(.+)", text)
-    for i, (cond, res) in enumerate(rules, 1):
-        results.append({
-            "id": f"rule_{i}",
-            "type": "규칙",
-            "condition": cond.strip(),
-            "result": res.strip()
-        })
-
-    return results
-
-def save_cases(results, out_dir="data/processed", fname="cases.json"):
-    os.makedirs(out_dir, exist_ok=True)
-    json_path = os.path.join(out_dir, fname)
-    csv_path = os.path.join(out_dir, fname.replace(".json", ".csv"))
+    return _collect(iter_tokens(text))
 
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+def parse_cases_file(path, encoding="utf-8", chunk_size=CHUNK_SIZE):
+    """parse_cases와 같은 결과를 파일 전체를 메모리에 올리지 않고 만든다."""
+    with open(path, "r", encoding=encoding) as f:
+        return _collect(iter_tokens(f, chunk_size))
 
-    df = pd.DataFrame(results)
-    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+# ---- 저장 (이어 쓰기) ----
+# 실행할 때마다 기존 데이터셋 뒤에 붙인다. 기존 파일은 다시 읽거나 덮어쓰지 않는다.
+FIELDS = ("id", "type", "content", "condition", "result", "source")
+ROW_GROUP_ROWS = 8192
 
-    return json_path, csv_path
\ No newline at end of file
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, rec):
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+def _csv_header(path):
+    """기존 CSV의 헤더 (없거나 빈 파일이면 None)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), None)
+
+class CsvWriter:
+    # utf-8-sig: BOM은 빈 파일에 처음 쓸 때만 붙는다 (엑셀 호환 유지)
+    def __init__(self, path):
+        # 헤더가 FIELDS와 다른 파일(예전 pandas 저장본: source 열 없음, 열 순서 다름)에
+        # 이어 쓰면 열이 어긋나므로 <stem>.v2.csv, v3 ... 중 처음 맞는 파일에 쓴다
+        root, ext = os.path.splitext(path)
+        n = 1
+        while _csv_header(path) not in (None, list(FIELDS)):
+            n += 1
+            path = f"{root}.v{n}{ext}"
+        self.path = path
+        self.count = 0
+        new = _csv_header(path) is None
+        self._f = open(path, "a", encoding="utf-8-sig", newline="")
+        self._w = csv.DictWriter(self._f, fieldnames=FIELDS, extrasaction="ignore")
+        if new:
+            self._w.writeheader()
+
+    def write(self, rec):
+        self._w.writerow(rec)
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception as e:
+        raise RuntimeError("pyarrow 미설치: pip install pyarrow") from e
+    return pa, pq
+
+class ParquetWriter:
+    """
+    Parquet 파일은 끝(footer)을 쓴 뒤 덧붙일 수 없으므로 path를 데이터셋 디렉터리로 쓰고
+    실행마다 part 파일 하나를 row group(``row_group_rows`` 행) 단위로 기록한다.
+    pd.read_parquet(path) / pyarrow.dataset.dataset(path)가 모든 part를 함께 읽는다.
+    """
+
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS):
+        self.path = path
+        self.count = 0
+        self.row_group_rows = row_group_rows
+        self._pa, self._pq = _pyarrow()
+        self.schema = self._pa.schema([(f, self._pa.string()) for f in FIELDS])
+        self.part = os.path.join(path, f"part-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+        self._rows = []
+        self._writer = None
+
+    def write(self, rec):
+        self._rows.append({f: rec.get(f) for f in FIELDS})
+        self.count += 1
+        if len(self._rows) >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self._writer is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._writer = self._pq.ParquetWriter(self.part, self.schema)
+        self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+def save_cases(results, out_dir="data/processed", fname="cases", formats=("jsonl", "csv"), source=None):
+    """
+    results(리스트 또는 iterable)를 한 건씩 형식별 파일에 이어 쓴다.
+    source를 주면 각 행에 출처(파일명 등)를 붙여 실행 간 id(case_1, rule_1 ...)를 구분한다.
+    반환: formats 순서대로의 경로 (parquet은 데이터셋 디렉터리, csv는 실제로 쓴 파일)
+
+    예전 기본값(fname="cases.json": JSON 배열로 덮어쓰기, 반환 (json, csv))과 달리
+    기본 출력은 cases.jsonl + cases.csv 이어 쓰기다. fname의 확장자는 무시된다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(fname)[0]
+    for fmt in formats:
+        if fmt not in WRITERS:
+            raise ValueError(f"지원하지 않는 저장 형식: {fmt}")
+    writers = []
+    try:
+        for fmt in formats:
+            writers.append(WRITERS[fmt](os.path.join(out_dir, f"{stem}.{fmt}")))
+        for rec in results:
+            if source is not None:
+                rec = {**rec, "source": source}
+            for w in writers:
+                w.write(rec)
+    finally:
+        for w in writers:
+            w.close()
+    return tuple(w.path for w in writers)
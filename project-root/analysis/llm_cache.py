@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""Persistent LLM response cache: re-export of backend/analysis/llm_cache.py (one implementation)."""
+from backend.analysis.llm_cache import (  # noqa: F401
+    CACHE_MAX_BYTES, CACHE_PATH, CACHE_TTL, LLMCache, cache_key, get_cache, normalize_prompt,
+)
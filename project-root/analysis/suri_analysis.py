@@ -2,23 +2,29 @@ from openai import OpenAI
 from .config import load_api_key
 from .db_utils import save_json, load_json
 from .prompts import SURI_ANALYSIS_PROMPT
+from .llm_cache import get_cache
 import time
 import os
 
 DATA_FILE = "data/suri_analysis.json"
+MODEL = "gpt-3.5-turbo"
+PROMPT_VERSION = 1  # SURI_ANALYSIS_PROMPT를 고치면 올릴 것 (캐시 무효화)
 
 client = OpenAI(api_key=load_api_key())
 
 def analyze_suri(data):
     prompt = SURI_ANALYSIS_PROMPT.format(data=data)
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3
-    )
+    def call():
+        response = client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3
+        )
+        return response.choices[0].message.content.strip()
 
-    result = response.choices[0].message.content.strip()
+    result = get_cache().cached(prompt, call, model=MODEL, temperature=0.3,
+                                template_version=PROMPT_VERSION)
 
     # 저장
     record = {
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent LLM response cache (SQLite).
+
+The key is a sha256 of the normalized prompt (NFKC, whitespace collapsed)
+plus model, temperature and the caller's prompt-template version, so
+bumping a template version or switching model never serves an old answer.
+Entries expire after ``ttl`` seconds; once the stored responses exceed
+``max_bytes`` the least recently used ones are dropped.  Hits and misses
+are counted per process (``hits``/``misses``) and in the database.
+
+  cache = get_cache()
+  text = cache.cached(prompt, lambda: call_llm(prompt), model="gpt-4o-mini",
+                      temperature=0, template_version=PROMPT_VERSION)
+
+stream_/ and project-root/backend/ are separate container build contexts, so
+each carries this file; the two copies are kept byte-identical
+(tests/test_llm_cache.py) and project-root/analysis re-exports the backend one.
+"""
+import hashlib, json, os, re, sqlite3, threading, time, unicodedata
+from typing import Callable, Dict
+
+# relative to the working directory (/app/data in the containers); point every app
+# at one file with LLM_CACHE_PATH to share the cache between them
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("data", "llm_cache.sqlite3"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 30 * 24 * 3600))
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 << 20))
+
+_WS = re.compile(r"\s+")
+
+def normalize_prompt(prompt: str) -> str:
+    return _WS.sub(" ", unicodedata.normalize("NFKC", prompt)).strip()
+
+def cache_key(prompt: str, model: str, temperature: float, template_version) -> str:
+    raw = json.dumps([normalize_prompt(prompt), model, float(temperature), str(template_version)],
+                     ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed);
+            CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        self._bytes = self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _count(self, name: str):
+        setattr(self, name, getattr(self, name) + 1)
+        self._conn.execute(
+            "INSERT INTO stats(name, value) VALUES(?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    # ---- lookup / store ----
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] <= self.ttl:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self._count("hits")
+                return row[0]
+            if row is not None:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bytes -= row[1]
+            self._count("misses")
+        return None
+
+    def put(self, key: str, response: str, model: str = ""):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, model, response, size, created, accessed) "
+                "VALUES(?, ?, ?, ?, ?, ?)", (key, model, response, size, now, now))
+            self._bytes += size - (old[0] if old else 0)
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def cached(self, prompt: str, compute: Callable[[], str], model: str,
+               temperature: float = 0, template_version=1) -> str:
+        """Stored response for this prompt, else ``compute()`` (stored before returning)."""
+        key = cache_key(prompt, model, temperature, template_version)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        out = compute()
+        self.put(key, out, model)
+        return out
+
+    # ---- eviction ----
+    def evict(self):
+        """Drop expired entries, then least recently used ones down to 90% of ``max_bytes``."""
+        with self._lock:
+            c = self._conn
+            c.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            # other processes share the file, so recount instead of trusting _bytes
+            excess = self._total_bytes() - int(self.max_bytes * 0.9)
+            if excess > 0:
+                freed, cutoff = 0, None
+                for accessed, size in c.execute("SELECT accessed, size FROM responses ORDER BY accessed"):
+                    freed += size
+                    cutoff = accessed
+                    if freed >= excess:
+                        break
+                if cutoff is not None:
+                    c.execute("DELETE FROM responses WHERE accessed <= ?", (cutoff,))
+            self._bytes = self._total_bytes()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": self._bytes,
+                "total_hits": total.get("hits", 0), "total_misses": total.get("misses", 0)}
+
+    def close(self):
+        self._conn.close()
+
+_CACHES: Dict[str, LLMCache] = {}
+
+def get_cache(path: str = CACHE_PATH) -> LLMCache:
+    """One shared cache per database file in this process."""
+    if path not in _CACHES:
+        _CACHES[path] = LLMCache(path)
+    return _CACHES[path]
@@ -3,8 +3,12 @@ from pathlib import Path
 from typing import Tuple, List
 
 from .db_utils import load_json, save_json
+from .prompts import build_auto_prompt
+from .llm_cache import get_cache
 
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "suri_analysis.json"
+MODEL = "gpt-3.5-turbo"
+PROMPT_VERSION = 1  # AUTO_ANALYSIS_BASE를 고치면 올릴 것 (캐시 무효화)
 
 
 def load_analysis() -> List[dict]:
@@ -15,9 +19,19 @@ def load_analysis() -> List[dict]:
 def save_analysis(data: List[dict]):
     """Persist analysis entries."""
     save_json(DB_PATH, data)
-    llm = ChatOpenAI(openai_api_key=api_key, temperature=0.2, model="gpt-3.5-turbo")
-    response = llm.invoke(prompt)
-    text = response.content
+
+
+def llm_auto_analysis(api_key: str, tiangan: str, dizhi: str, gender: str, topic: str) -> Tuple[List[str], str]:
+    """Ask the LLM for the five analysis fields; returns (fields, prompt used)."""
+    prompt = build_auto_prompt(tiangan, dizhi, gender, topic)
+
+    def call():
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(openai_api_key=api_key, temperature=0.2, model=MODEL)
+        return llm.invoke(prompt).content
+
+    text = get_cache().cached(prompt, call, model=MODEL, temperature=0.2,
+                              template_version=PROMPT_VERSION)
     parts = re.split(r"\n?[\d\.]+[\)\.] ", text)
     if len(parts) < 6:
         table = tiangan_desc = dizhi_desc = hapchung_desc = reality = ""
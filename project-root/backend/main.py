@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import Body, FastAPI, HTTPException, Header, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from starlette.responses import StreamingResponse
 import io
 import csv
+import json
 import time
+import zlib
+
+from rule_store import get_store
 
 app = FastAPI(title="HCJ API", version="1.0.0")
 
@@ -26,11 +30,20 @@ class Rule(BaseModel):
     action: str
 
 
-# 데모용 인메모리 저장
-_rules: List[Rule] = [
-    Rule(id=1, condition="text contains 'error'", action="label='issue'"),
-    Rule(id=2, condition="score > 0.9", action="route='priority'"),
-]
+class NewRule(BaseModel):
+    id: Optional[int] = Field(None, description="omit to let the store assign the next free id")
+    condition: str
+    action: str
+
+
+class RulePatch(BaseModel):
+    id: int
+    condition: Optional[str] = None
+    action: Optional[str] = None
+
+
+# 규칙 저장소: SQLite(WAL) — 재시작해도 유지되고 uvicorn 워커끼리 공유
+store = get_store()
 
 
 @app.get("/health")
@@ -40,41 +53,70 @@ def health():
 
 @app.get("/rules", response_model=List[Rule])
 def list_rules():
-    return _rules
+    return store.list()
+
+
+# ---- 일괄 처리: 전부 반영되거나 아무것도 반영되지 않음 ----
+# /rules/{rule_id}보다 먼저 선언해야 "bulk"가 id로 해석되지 않는다
+BULK_MAX = 50_000
+
+
+def _bulk(items: list, apply, done: str):
+    if len(items) > BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"at most {BULK_MAX} items per request")
+    conflicts = apply()
+    if conflicts:
+        raise HTTPException(status_code=409, detail={"conflicts": conflicts})
+    return {done: len(items)}
+
+
+@app.post("/rules/bulk", status_code=201)
+def add_rules_bulk(rules: List[NewRule]):
+    items = [r.model_dump() for r in rules]
+    out = _bulk(items, lambda: store.add_many(items), "created")
+    out["ids"] = [r["id"] for r in items]
+    return out
+
+
+@app.patch("/rules/bulk")
+def edit_rules_bulk(patches: List[RulePatch]):
+    return _bulk(patches, lambda: store.update_many([p.model_dump() for p in patches]), "updated")
+
+
+@app.delete("/rules/bulk")
+def delete_rules_bulk(ids: List[int] = Body(...)):
+    return _bulk(ids, lambda: store.delete_many(ids), "deleted")
 
 
 @app.get("/rules/{rule_id}", response_model=Rule)
 def get_rule(rule_id: int):
-    for r in _rules:
-        if r.id == rule_id:
-            return r
-    raise HTTPException(status_code=404, detail="Rule not found")
+    r = store.get(rule_id)
+    if r is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return r
 
 
 @app.post("/rules", response_model=Rule, status_code=201)
 def add_rule(rule: Rule):
-    if any(r.id == rule.id for r in _rules):
+    if not store.add(rule.model_dump()):
         raise HTTPException(status_code=409, detail="Duplicate id")
-    _rules.append(rule)
     return rule
 
 
 @app.put("/rules/{rule_id}", response_model=Rule)
 def edit_rule(rule_id: int, rule: Rule):
-    for i, r in enumerate(_rules):
-        if r.id == rule_id:
-            _rules[i] = rule
-            return rule
-    raise HTTPException(status_code=404, detail="Rule not found")
+    ok = store.replace(rule_id, rule.model_dump())
+    if ok is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    if not ok:
+        raise HTTPException(status_code=409, detail="Duplicate id")
+    return rule
 
 
 @app.delete("/rules/{rule_id}", status_code=204)
 def delete_rule(rule_id: int):
-    for i, r in enumerate(_rules):
-        if r.id == rule_id:
-            _rules.pop(i)
-            return
-    raise HTTPException(status_code=404, detail="Rule not found")
+    if not store.delete(rule_id):
+        raise HTTPException(status_code=404, detail="Rule not found")
 
 
 @app.post("/upload-image")
@@ -88,17 +130,122 @@ async def upload_image(file: UploadFile = File(...)):
     }
 
 
-@app.get("/export")
-def export_rules_csv():
-    # CSV 스트림으로 내보내기
+EXPORT_CHUNK = 64 * 1024
+EXPORT_ROW_GROUP = 10_000
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "rules.csv"),
+    "ndjson": ("application/x-ndjson", "rules.ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "rules.parquet"),
+}
+
+
+def _csv_chunks(rows):
     buf = io.StringIO()
     writer = csv.DictWriter(buf, fieldnames=["id", "condition", "action"])
     writer.writeheader()
-    for r in _rules:
-        writer.writerow(r.model_dump())
-    buf.seek(0)
-    return StreamingResponse(
-        io.BytesIO(buf.getvalue().encode("utf-8")),
-        media_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="rules.csv"'},
-    )
+    for r in rows:
+        writer.writerow(r)
+        if buf.tell() >= EXPORT_CHUNK:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(rows):
+    lines, size = [], 0
+    for r in rows:
+        line = json.dumps(r, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK:
+            yield "".join(lines).encode("utf-8")
+            lines, size = [], 0
+    yield "".join(lines).encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    # ParquetWriter가 쓰는 파일 객체: 쓴 바이트를 모아 두었다가 row group마다 꺼내 보낸다
+    def __init__(self):
+        self._parts, self._pos = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def take(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+def _parquet_chunks(rows):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except Exception as e:
+        raise HTTPException(status_code=501, detail="parquet export requires pyarrow") from e
+    schema = pa.schema([("id", pa.int64()), ("condition", pa.string()), ("action", pa.string())])
+
+    def gen():
+        out = _Drain()
+        writer = pq.ParquetWriter(out, schema)
+        batch = []
+        for r in rows:
+            batch.append(r)
+            if len(batch) >= EXPORT_ROW_GROUP:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield out.take()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        writer.close()
+        yield out.take()
+
+    return gen()
+
+
+def _gzip(chunks):
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip 헤더/트레일러
+    for c in chunks:
+        out = z.compress(c)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    for part in (header or "").split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if name.lower() not in ("gzip", "*"):
+            continue
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    return float(p[2:]) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+@app.get("/export")
+def export_rules(format: str = "csv", accept_encoding: Optional[str] = Header(None)):
+    # 저장소에서 읽는 대로 청크 단위로 흘려보낸다 (전체를 메모리에 모으지 않음)
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    media_type, filename = EXPORT_FORMATS[format]
+    rows = store.iter_rules()
+    chunks = {"csv": _csv_chunks, "ndjson": _ndjson_chunks, "parquet": _parquet_chunks}[format](rows)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    # parquet은 컬럼 단위로 이미 압축되어 있어 gzip을 씌우지 않는다
+    if format != "parquet" and _accepts_gzip(accept_encoding):
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite rule store for the /rules API.
+
+Rules live in one table keyed by ``id`` (INTEGER PRIMARY KEY = the rowid,
+so lookups, updates and the duplicate check are a single index probe, not
+a scan).  The database runs in WAL mode: readers never block the writer,
+every uvicorn worker opens its own connections, and writes take the lock
+up front (BEGIN IMMEDIATE) and wait up to ``timeout`` seconds for it.
+
+  store = get_store()
+  store.add({"id": 3, "condition": "...", "action": "..."})   # False if the id exists
+  store.get(3)
+  store.add_many(rules)       # [] when all were inserted, else per-item conflicts and nothing written
+                              # (rules with id None are numbered after max(id); the ids are written back)
+"""
+import os, sqlite3, threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+RULES_DB_PATH = os.getenv("RULES_DB_PATH", str(Path(__file__).resolve().parent / "data" / "rules.sqlite3"))
+RULES_DB_TIMEOUT = float(os.getenv("RULES_DB_TIMEOUT", 30))
+
+FIELDS = ("id", "condition", "action")
+_IN_CHUNK = 900  # bound variables per IN (...) query
+
+# 예전 인메모리 _rules 초기값. 기본으로는 넣지 않음 (run_pipeline id 1, 2와 충돌);
+# 데모용으로 RuleStore(path, seed=SEED_RULES)
+SEED_RULES = [
+    {"id": 1, "condition": "text contains 'error'", "action": "label='issue'"},
+    {"id": 2, "condition": "score > 0.9", "action": "route='priority'"},
+]
+
+def _row(r) -> Dict:
+    return {"id": r[0], "condition": r[1], "action": r[2]}
+
+class RuleStore:
+    def __init__(self, path: str = RULES_DB_PATH, timeout: float = RULES_DB_TIMEOUT, seed: List[Dict] = ()):
+        self.path = path
+        self.timeout = timeout
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        # FastAPI runs sync endpoints in a thread pool: one connection per thread
+        self._local = threading.local()
+        with self.transaction() as c:
+            fresh = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rules'").fetchone() is None
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS rules (
+                    id INTEGER PRIMARY KEY,
+                    condition TEXT NOT NULL,
+                    action TEXT NOT NULL
+                )""")
+            if fresh and seed:
+                c.executemany("INSERT INTO rules(id, condition, action) VALUES(:id, :condition, :action)", seed)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction: holds the database write lock until commit/rollback."""
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            yield c
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
+
+    # ---- read ----
+    def get(self, rule_id: int) -> Optional[Dict]:
+        r = self._conn().execute("SELECT id, condition, action FROM rules WHERE id = ?", (rule_id,)).fetchone()
+        return _row(r) if r else None
+
+    def iter_rules(self, batch_size: int = 1000) -> Iterator[Dict]:
+        """All rules by id, read in keyset pages so no transaction stays open between pages."""
+        after = None
+        while True:
+            if after is None:
+                rows = self._conn().execute(
+                    "SELECT id, condition, action FROM rules ORDER BY id LIMIT ?", (batch_size,)).fetchall()
+            else:
+                rows = self._conn().execute(
+                    "SELECT id, condition, action FROM rules WHERE id > ? ORDER BY id LIMIT ?",
+                    (after, batch_size)).fetchall()
+            for r in rows:
+                yield _row(r)
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][0]
+
+    def list(self) -> List[Dict]:
+        return list(self.iter_rules())
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM rules").fetchone()[0]
+
+    # ---- write ----
+    def add(self, rule: Dict) -> bool:
+        """False if a rule with this id already exists."""
+        with self.transaction() as c:
+            cur = c.execute("INSERT INTO rules(id, condition, action) VALUES(?, ?, ?) ON CONFLICT(id) DO NOTHING",
+                            (rule["id"], rule["condition"], rule["action"]))
+            return cur.rowcount == 1
+
+    def replace(self, rule_id: int, rule: Dict) -> Optional[bool]:
+        """
+        Overwrite rule ``rule_id`` with ``rule`` (whose id may differ).
+        None: no such rule, False: the new id belongs to another rule.
+        """
+        with self.transaction() as c:
+            if rule["id"] != rule_id and c.execute("SELECT 1 FROM rules WHERE id = ?", (rule["id"],)).fetchone():
+                return False if c.execute("SELECT 1 FROM rules WHERE id = ?", (rule_id,)).fetchone() else None
+            cur = c.execute("UPDATE rules SET id = ?, condition = ?, action = ? WHERE id = ?",
+                            (rule["id"], rule["condition"], rule["action"], rule_id))
+            return True if cur.rowcount else None
+
+    def delete(self, rule_id: int) -> bool:
+        with self.transaction() as c:
+            return c.execute("DELETE FROM rules WHERE id = ?", (rule_id,)).rowcount == 1
+
+    # ---- batches (all-or-nothing) ----
+    def _existing(self, c, ids) -> set:
+        found = set()
+        ids = [i for i in ids if i is not None]
+        for i in range(0, len(ids), _IN_CHUNK):
+            part = ids[i:i + _IN_CHUNK]
+            found.update(r[0] for r in c.execute(
+                f"SELECT id FROM rules WHERE id IN ({','.join('?' * len(part))})", part))
+        return found
+
+    @staticmethod
+    def _repeated(ids) -> List[Dict]:
+        seen, out = set(), []
+        for i, rid in enumerate(ids):
+            if rid is None:
+                continue
+            if rid in seen:
+                out.append({"index": i, "id": rid, "error": "repeated in request"})
+            seen.add(rid)
+        return out
+
+    def _batch(self, ids, must_exist: bool, apply) -> List[Dict]:
+        """
+        Check every item, then run ``apply(conn)`` in the same transaction only
+        if none conflicts.  Returns the conflicts ([] when applied).
+        """
+        with self.transaction() as c:
+            existing = self._existing(c, set(ids))
+            conflicts = self._repeated(ids)
+            bad = (lambda rid: rid not in existing) if must_exist else (lambda rid: rid in existing)
+            error = "not found" if must_exist else "id exists"
+            conflicts += [{"index": i, "id": rid, "error": error}
+                          for i, rid in enumerate(ids) if rid is not None and bad(rid)]
+            if not conflicts:
+                apply(c)
+            return sorted(conflicts, key=lambda x: x["index"])
+
+    def add_many(self, rules: List[Dict]) -> List[Dict]:
+        """
+        Rules whose id is None get the ids after the largest one in the store or
+        the batch, allocated under the write lock and written back into the dicts.
+        """
+        def apply(c):
+            free = [r for r in rules if r.get("id") is None]
+            if free:
+                top = c.execute("SELECT COALESCE(MAX(id), 0) FROM rules").fetchone()[0]
+                top = max([top] + [r["id"] for r in rules if r.get("id") is not None])
+                for rid, r in enumerate(free, top + 1):
+                    r["id"] = rid
+            c.executemany("INSERT INTO rules(id, condition, action) VALUES(:id, :condition, :action)", rules)
+        return self._batch([r.get("id") for r in rules], False, apply)
+
+    def update_many(self, patches: List[Dict]) -> List[Dict]:
+        """Patches carry ``id`` and any of condition/action; missing fields are left unchanged."""
+        return self._batch([p["id"] for p in patches], True, lambda c: c.executemany(
+            "UPDATE rules SET condition = COALESCE(?, condition), action = COALESCE(?, action) WHERE id = ?",
+            [(p.get("condition"), p.get("action"), p["id"]) for p in patches]))
+
+    def delete_many(self, ids: List[int]) -> List[Dict]:
+        return self._batch(list(ids), True, lambda c: c.executemany(
+            "DELETE FROM rules WHERE id = ?", [(i,) for i in ids]))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_STORES: Dict[str, RuleStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def get_store(path: str = RULES_DB_PATH) -> RuleStore:
+    """One store per database file in this process."""
+    with _STORES_LOCK:
+        if path not in _STORES:
+            _STORES[path] = RuleStore(path)
+        return _STORES[path]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rule store benchmark: the old in-memory list scan vs the SQLite store at 100k rules.
+
+  python scripts/bench_rule_store.py --rules 100000 --ops 2000 --workers 4
+
+Uses a throwaway database.  --workers processes then add/read/delete disjoint
+id ranges at the same time (as uvicorn workers would) and the final count is
+checked.
+"""
+import argparse, multiprocessing as mp, os, random, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from rule_store import RuleStore  # noqa: E402
+
+def rule(i: int):
+    return {"id": i, "condition": f"score > {i % 100 / 100}", "action": f"label='r{i}'"}
+
+def timed(label, n, fn):
+    t0 = time.perf_counter()
+    fn()
+    sec = time.perf_counter() - t0
+    print(f"{label:28}: {n} ops in {sec:.3f} s ({n / sec:,.0f} ops/s)")
+
+def list_baseline(n_rules: int, ids):
+    rules = [rule(i) for i in range(1, n_rules + 1)]
+
+    def lookups():
+        for i in ids:
+            next(r for r in rules if r["id"] == i)
+
+    def duplicate_checks():
+        for i in ids:
+            any(r["id"] == i for r in rules)
+
+    timed("list: get (scan)", len(ids), lookups)
+    timed("list: duplicate check", len(ids), duplicate_checks)
+
+def worker(path: str, start: int, n: int, q):
+    store = RuleStore(path)
+    for i in range(start, start + n):
+        assert store.add(rule(i))
+        assert store.get(i)["id"] == i
+    for i in range(start, start + n, 2):
+        assert store.delete(i)
+    q.put(n - len(range(start, start + n, 2)))
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the /rules storage layer")
+    ap.add_argument("--rules", type=int, default=100_000)
+    ap.add_argument("--ops", type=int, default=2000, help="random get/update/delete operations")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--per-worker", type=int, default=2000)
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    ids = rnd.sample(range(1, args.rules + 1), args.ops)
+    list_baseline(args.rules, ids)
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "rules.sqlite3")
+        store = RuleStore(path, seed=[])
+        timed("sqlite: add (1 txn each)", args.rules, lambda: [store.add(rule(i)) for i in range(1, args.rules + 1)])
+        timed("sqlite: get", len(ids), lambda: [store.get(i) for i in ids])
+        timed("sqlite: duplicate add", len(ids), lambda: [store.add(rule(i)) for i in ids])
+        timed("sqlite: replace", len(ids), lambda: [store.replace(i, {**rule(i), "action": "x"}) for i in ids])
+        timed("sqlite: delete", len(ids), lambda: [store.delete(i) for i in ids])
+        timed("sqlite: iter_rules", args.rules - len(ids), lambda: sum(1 for _ in store.iter_rules()))
+        if store.count() != args.rules - len(ids):
+            sys.exit("[ERROR] count mismatch")
+
+        q = mp.Queue()
+        base = args.rules + 1
+        procs = [mp.Process(target=worker, args=(path, base + w * args.per_worker, args.per_worker, q))
+                 for w in range(args.workers)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        sec = time.perf_counter() - t0
+        if any(p.exitcode for p in procs):
+            sys.exit("[ERROR] worker failed")
+        kept = sum(q.get() for _ in procs)
+        if store.count() != args.rules - len(ids) + kept:
+            sys.exit("[ERROR] concurrent count mismatch")
+        n = args.workers * args.per_worker
+        print(f"{args.workers} processes concurrently : {n * 2 + n // 2} ops in {sec:.3f} s, count ok")
+
+if __name__ == "__main__":
+    main()
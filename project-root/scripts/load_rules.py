@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load run_pipeline output into the rules API through POST /rules/bulk.
+
+  python scripts/load_rules.py ../stream_/output/rules_output.jsonl --url http://localhost:8000
+
+"if"/"then" (run_pipeline) or "condition"/"result" (case_parser) become
+condition/action.  case_parser "사례" (case) records carry no rule and are
+skipped.  Integer ids (run_pipeline) are kept; records without one
+(case_parser's "rule_1", ...) are sent without an id and numbered by the store
+after its current maximum, as are all records with --store-ids.  A batch with
+conflicts is rejected as a whole: its conflicts are printed and loading stops.
+Standard library only.
+"""
+import argparse, gzip, json, sys, time, urllib.error, urllib.request
+from itertools import islice
+
+def read_records(path: str):
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+        return
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def to_rules(records, keep_ids: bool = True):
+    for rec in records:
+        if rec.get("type", "규칙") != "규칙":
+            continue
+        rid = rec.get("id")
+        rule = {"condition": str(rec.get("if", rec.get("condition")) or ""),
+                "action": str(rec.get("then", rec.get("result")) or "")}
+        if keep_ids and isinstance(rid, int) and not isinstance(rid, bool):
+            rule["id"] = rid
+        yield rule
+
+def post_json(url: str, payload, timeout: float = 300):
+    """(status, decoded body); 4xx/5xx are returned, not raised."""
+    req = urllib.request.Request(url, data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.status, json.load(r)
+    except urllib.error.HTTPError as e:
+        with e:
+            return e.code, json.load(e)
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-load extracted rules into the /rules API")
+    ap.add_argument("input", help="run_pipeline .jsonl(.gz) / .json, or case_parser .jsonl")
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--batch-size", type=int, default=5000)
+    ap.add_argument("--store-ids", action="store_true",
+                    help="ignore the records' ids; the store numbers every rule after its current maximum")
+    args = ap.parse_args()
+
+    rules = to_rules(read_records(args.input), keep_ids=not args.store_ids)
+    total, t0 = 0, time.perf_counter()
+    while True:
+        batch = list(islice(rules, args.batch_size))
+        if not batch:
+            break
+        status, body = post_json(f"{args.url}/rules/bulk", batch)
+        if status == 409:
+            for c in body["detail"]["conflicts"][:20]:
+                print(f"[CONFLICT] #{total + c['index']} id={c['id']}: {c['error']}")
+            sys.exit(f"[ERROR] batch starting at #{total} rejected; {total} rules loaded")
+        if status >= 400:
+            sys.exit(f"[ERROR] HTTP {status}: {body}; {total} rules loaded")
+        total += len(batch)
+    sec = time.perf_counter() - t0
+    print(f"✅ {total} rules in {sec:.2f} s ({total / max(sec, 1e-9):.0f} rules/s) → {args.url}")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import pandas as pd
 import plotly.express as px
 import psycopg2
 import psycopg2.extras
+from db_pool import get_pool
 import os, streamlit as st
 
 # DB_URL 우선순위: Streamlit Secrets > 환경변수 > (옵션) 하드코딩 기본값
@@ -21,26 +22,21 @@ DB_URL = (
 if not DB_URL:
     st.error("⚠️ DB_URL이 설정되어 있지 않습니다. Secrets 또는 환경변수에 DB_URL을 넣어주세요.")
     st.stop()
-@st.cache_resource(show_spinner=False)
 def get_conn():
-    conn = psycopg2.connect(DB_URL)
-    conn.autocommit = False
-    return conn
+    # 세션마다 풀에서 따로 빌리고 with 블록이 끝나면 반납 (성공 시 커밋, 오류 시 롤백)
+    return get_pool(DB_URL).connection()
 
 def run_query(sql: str, params: tuple | list | None = None) -> list[dict]:
-    conn = get_conn()
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+    with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
         cur.execute(sql, params or [])
         if cur.description:
             return [dict(r) for r in cur.fetchall()]
         return []
 
 def run_exec(sql: str, params: tuple | list | None = None) -> int:
-    conn = get_conn()
-    with conn.cursor() as cur:
+    with get_conn() as conn, conn.cursor() as cur:
         cur.execute(sql, params or [])
-    conn.commit()
-    return cur.rowcount
+        return cur.rowcount
 
 # ──────────────────────────────────────────────────────────────────────────────
 # DDL(최소 테이블): passages, chunk_edits  ※ 이미 있으면 IF NOT EXISTS로 스킵
@@ -68,6 +64,8 @@ ensure_schema()
 
 st.set_page_config(page_title="Databox — DB Direct", layout="wide")
 st.title("📦 Databox — Streamlit(DB 직접 연결)")
+with st.sidebar.expander("DB 연결 풀"):
+    st.json(get_pool(DB_URL).stats())
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 업로드 → 간단 인제스트(청크 분할) → passages에 삽입
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Shared psycopg2 connection pool.
+
+  from db_pool import get_pool
+  with get_pool(dsn).connection() as conn, conn.cursor() as cur:
+      cur.execute(...)            # committed on exit, rolled back on error
+
+Each checkout gets its own connection (blocking up to ``timeout`` when all
+``maxconn`` are busy).  A connection idle for more than ``check_after``
+seconds is pinged before it is handed out; dead ones are dropped until a
+live (or newly opened) connection is found.  One that raised a connection
+error is closed instead of being returned.  stats() reports pool usage.
+
+streamlit_app/ in project-root is a separate build context with its own
+byte-identical copy of this file (tests/test_db_pool.py).
+"""
+import os, threading, time
+from contextlib import contextmanager
+from typing import Dict
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+
+POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", 30))
+
+_BROKEN = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+class ConnectionPool:
+    def __init__(self, dsn: str = None, minconn: int = POOL_MIN, maxconn: int = POOL_MAX,
+                 timeout: float = POOL_TIMEOUT, check_after: float = CHECK_AFTER, **connect_kwargs):
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_after = check_after
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, dsn, **connect_kwargs)
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._returned: Dict[int, float] = {}
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.reconnects = 0
+        self.discarded = 0
+        self.wait_seconds = 0.0
+
+    # ---- checkout / return ----
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        with self._lock:
+            returned = self._returned.get(id(conn), 0.0)
+        if time.monotonic() - returned < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        t0 = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pg_pool.PoolError(f"connection pool exhausted ({self.maxconn} in use)")
+        try:
+            # after a server restart every idle connection is dead: drop them one by one;
+            # once the idle ones are gone the pool opens a new connection
+            for _ in range(self.maxconn + 1):
+                conn = self._pool.getconn()
+                if self._healthy(conn):
+                    break
+                self._pool.putconn(conn, close=True)
+                with self._lock:
+                    self._returned.pop(id(conn), None)
+                    self.reconnects += 1
+            else:
+                raise psycopg2.OperationalError(f"no healthy connection after {self.maxconn + 1} attempts")
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.wait_seconds += time.monotonic() - t0
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return conn
+
+    def putconn(self, conn, broken: bool = False):
+        if not broken and not conn.closed:
+            try:
+                conn.rollback()  # never hand an open transaction to the next borrower
+                conn.autocommit = False
+            except psycopg2.Error:
+                broken = True
+        close = broken or bool(conn.closed)
+        with self._lock:
+            self.in_use -= 1
+            if close:
+                self.discarded += 1
+                self._returned.pop(id(conn), None)
+            else:
+                self._returned[id(conn)] = time.monotonic()
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, autocommit: bool = False):
+        conn = self.getconn()
+        broken = False
+        try:
+            conn.autocommit = autocommit
+            yield conn
+            if not autocommit:
+                conn.commit()
+        except _BROKEN:
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn, broken)
+
+    # ---- metrics ----
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            opened = len(self._pool._pool) + len(self._pool._used)
+            return {"max": self.maxconn, "open": opened, "in_use": self.in_use,
+                    "idle": len(self._pool._pool), "peak_in_use": self.peak_in_use,
+                    "checkouts": self.checkouts, "reconnects": self.reconnects,
+                    "discarded": self.discarded, "wait_seconds": round(self.wait_seconds, 3)}
+
+    def close(self):
+        self._pool.closeall()
+
+_POOLS: Dict[tuple, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_pool(dsn: str = None, **connect_kwargs) -> ConnectionPool:
+    """One pool per DSN/connect arguments in this process."""
+    key = (dsn, tuple(sorted(connect_kwargs.items())))
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ConnectionPool(dsn, **connect_kwargs)
+        return _POOLS[key]
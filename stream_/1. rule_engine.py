@@ -1,5 +1,15 @@
+from rule_engine import NO_MATCH, RuleEngine
+
+def _has(saju_features, key):
+    # 예전과 같이 값의 truthiness로 판단 (개수 등 bool이 아닌 값도 허용)
+    if isinstance(saju_features, dict):
+        return bool(saju_features.get(key))
+    return key in saju_features
+
 def evaluate_rule(rule, saju_features):
-    cond = rule['condition']
-    if '재성이 강하면' in cond and saju_features.get('has_gan("재성")'):
+    # 예전 판정 유지: 재성이 천간에 투출(has_gan)했으면 "재성이 강하면"을 만족한 것으로 봄
+    if '재성이 강하면' in rule.get('condition', '') and _has(saju_features, 'has_gan("재성")'):
         return rule['result']
-    return "조건 불충족"
+    # one-off check; for many rules build a RuleEngine once and call evaluate()
+    fired = RuleEngine([rule]).evaluate(saju_features)
+    return fired[0]["result"] if fired else NO_MATCH
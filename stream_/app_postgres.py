@@ -1,9 +1,15 @@
 import streamlit as st
-import psycopg2
 import pandas as pd
 import json
+import re
+import unicodedata
 import openai
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from llm_cache import get_cache
+import db
+from db import bulk_insert_terms, count_terms, create_schema, find_terms
+from db_pool import get_pool
 
 # =========================
 # 환경 설정 (Secrets)
@@ -22,79 +28,153 @@ DB_CONFIG = {
 # DB 연결 함수
 # =========================
 def get_conn():
-    return psycopg2.connect(**DB_CONFIG)
+    """풀에서 빌린 연결 (with 블록 종료 시 커밋 후 반납)."""
+    return get_pool(**DB_CONFIG).connection()
 
 # =========================
 # DB 초기화
 # =========================
 def init_db():
     with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS original_docs (
-            id SERIAL PRIMARY KEY,
-            filename TEXT,
-            content TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS structured_terms (
-            id SERIAL PRIMARY KEY,
-            category TEXT,
-            term TEXT,
-            definition TEXT,
-            explanation TEXT,
-            examples JSONB,
-            rules JSONB,
-            keywords JSONB,
-            source_file TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-        conn.commit()
+        create_schema(cur)
 
 # =========================
 # DB 저장 함수
 # =========================
 def save_original(filename, content):
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            "INSERT INTO original_docs (filename, content) VALUES (%s, %s)",
-            (filename, content)
-        )
-        conn.commit()
+    """내용 해시로 중복 제거해 압축 저장. 반환: (doc_id, 기존 구조화 항목 수 또는 0)"""
+    with get_conn() as conn:
+        doc_id, created = db.save_original(conn, filename, content)
+        return doc_id, (0 if created else count_terms(conn, doc_id))
 
-def save_structured(data, source_file):
-    with get_conn() as conn, conn.cursor() as cur:
-        for item in data:
-            cur.execute("""
-                INSERT INTO structured_terms
-                (category, term, definition, explanation, examples, rules, keywords, source_file)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, (
-                item.get('category'), item.get('term'), item.get('definition'),
-                item.get('explanation'),
-                json.dumps(item.get('examples', []), ensure_ascii=False),
-                json.dumps(item.get('rules', []), ensure_ascii=False),
-                json.dumps(item.get('keywords', []), ensure_ascii=False),
-                source_file
-            ))
-        conn.commit()
+def save_structured(data, source_file, doc_id=None, batch_size=5000):
+    """COPY로 한 트랜잭션에 적재; 처리량 통계를 돌려줌."""
+    with get_conn() as conn:
+        return bulk_insert_terms(conn, data, source_file, doc_id=doc_id, batch_size=batch_size)
 
 # =========================
 # AI 구조화 함수
 # =========================
-def ai_extract_terms(text):
+EXTRACT_MODEL = "gpt-4o-mini"
+EXTRACT_PROMPT_VERSION = 2  # 프롬프트 문구를 바꾸면 올릴 것 (캐시 무효화); 2: 검증 전에 캐시된 답 폐기
+CHUNK_TOKENS = 6000         # 청크당 본문 토큰 상한 (응답 여유를 남김)
+EXTRACT_WORKERS = 4         # 동시에 보내는 청크 요청 수
+LIST_FIELDS = ("examples", "rules", "keywords")
+
+def _token_counter():
+    try:
+        import tiktoken
+        enc = tiktoken.encoding_for_model(EXTRACT_MODEL)
+        return lambda s: len(enc.encode(s))
+    except Exception:
+        # tiktoken 없음: 한글은 글자당 1토큰 이하이므로 글자 수로 넉넉히 잡는다
+        return len
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, count=None):
+    """문단 단위로 묶되 max_tokens를 넘지 않게 자름 (긴 문단은 문장, 그래도 길면 글자 단위)."""
+    count = count or _token_counter()
+    pieces = []
+    for para in re.split(r"\n\s*\n", text):
+        if not para.strip():
+            continue
+        if count(para) <= max_tokens:
+            pieces.append(para)
+            continue
+        for sent in re.split(r"(?<=[다요음함\.!\?])\s+", para):
+            n = count(sent)
+            while n > max_tokens:
+                cut = max(1, len(sent) * max_tokens // n)
+                pieces.append(sent[:cut])
+                sent = sent[cut:]
+                n = count(sent)
+            if sent.strip():
+                pieces.append(sent)
+    chunks, cur, cur_n = [], [], 0
+    for piece in pieces:
+        n = count(piece) + 1
+        if cur and cur_n + n > max_tokens:
+            chunks.append("\n\n".join(cur))
+            cur, cur_n = [], 0
+        cur.append(piece)
+        cur_n += n
+    if cur:
+        chunks.append("\n\n".join(cur))
+    return chunks
+
+def _parse_terms(content):
+    content = content.strip()
+    if content.startswith("```"):
+        content = re.sub(r"^```\w*\s*|\s*```$", "", content)
+    data = json.loads(content)
+    if isinstance(data, dict):
+        # {"terms": [...]} 처럼 감싸서 답한 경우
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    return [d for d in data if isinstance(d, dict)]
+
+def _extract_chunk(text):
     prompt = f"""
     다음 문서에서 주요 용어, 정의, 설명, 사례, 규칙, 키워드를 JSON 배열로 출력:
     {text}
     """
-    resp = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0
-    )
-    return json.loads(resp.choices[0].message.content)
+    def call():
+        resp = openai.ChatCompletion.create(
+            model=EXTRACT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0
+        )
+        content = resp.choices[0].message.content
+        _parse_terms(content)  # 파싱 안 되는 답은 예외 → 캐시에 저장하지 않음
+        return content
+    content = get_cache().cached(prompt, call, model=EXTRACT_MODEL, temperature=0,
+                                 template_version=EXTRACT_PROMPT_VERSION)
+    return _parse_terms(content)
+
+def _term_key(item):
+    term = unicodedata.normalize("NFKC", str(item.get("term") or ""))
+    return re.sub(r"\s+", "", term).casefold()
+
+def _as_list(v):
+    if v is None or v == "":
+        return []
+    return v if isinstance(v, list) else [v]
+
+def merge_terms(parts):
+    """청크별 결과를 합침: 같은 용어(NFKC·공백·대소문자 무시)는 한 항목으로, 목록 필드는 합집합."""
+    merged, out = {}, []
+    for items in parts:
+        for item in items:
+            key = _term_key(item)
+            cur = merged.get(key) if key else None
+            if cur is None:
+                cur = dict(item)
+                for f in LIST_FIELDS:
+                    cur[f] = _as_list(item.get(f))
+                if key:
+                    merged[key] = cur
+                out.append(cur)
+                continue
+            for f in ("category", "definition"):
+                if not cur.get(f) and item.get(f):
+                    cur[f] = item[f]
+            extra = str(item.get("explanation") or "").strip()
+            if extra and extra not in str(cur.get("explanation") or ""):
+                cur["explanation"] = f"{cur['explanation']}\n{extra}" if cur.get("explanation") else extra
+            for f in LIST_FIELDS:
+                seen = {json.dumps(v, ensure_ascii=False, sort_keys=True) for v in cur[f]}
+                for v in _as_list(item.get(f)):
+                    k = json.dumps(v, ensure_ascii=False, sort_keys=True)
+                    if k not in seen:
+                        seen.add(k)
+                        cur[f].append(v)
+    return out
+
+def ai_extract_terms(text, max_tokens=CHUNK_TOKENS, workers=EXTRACT_WORKERS):
+    """문서를 토큰 기준으로 나눠 청크별로 병렬 추출(map)한 뒤 용어 단위로 병합(reduce)."""
+    chunks = chunk_text(text, max_tokens)
+    if len(chunks) <= 1:
+        return merge_terms([_extract_chunk(c) for c in chunks])
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return merge_terms(ex.map(_extract_chunk, chunks))
 
 # =========================
 # Streamlit UI
@@ -105,6 +185,9 @@ st.title("📄 문서 AI 구조화 & PostgreSQL 저장기")
 # 초기화
 init_db()
 
+with st.sidebar.expander("DB 연결 풀"):
+    st.json(get_pool(**DB_CONFIG).stats())
+
 tab1, tab2 = st.tabs(["1️⃣ 업로드 & 저장", "2️⃣ DB 조회/수정/삭제"])
 
 # -------------------------
@@ -118,30 +201,75 @@ with tab1:
         st.text_area("원문", raw_text[:2000], height=300)
 
         if st.button("AI 구조화 & DB 저장"):
-            # 1. 원문 저장
-            save_original(uploaded.name, raw_text)
+            # 1. 원문 저장 (같은 내용이면 기존 문서를 씀)
+            doc_id, existing = save_original(uploaded.name, raw_text)
 
-            # 2. AI 구조화
-            with st.spinner("AI가 문서를 분석 중입니다..."):
-                structured_data = ai_extract_terms(raw_text)
+            if existing:
+                # 이미 구조화된 문서: AI 호출 없이 기존 항목 사용
+                st.info(f"♻️ 같은 내용의 문서가 이미 있습니다 (문서 ID {doc_id}) — "
+                        f"기존 {existing}개 항목을 그대로 사용합니다.")
+            else:
+                # 2. AI 구조화
+                with st.spinner("AI가 문서를 분석 중입니다..."):
+                    structured_data = ai_extract_terms(raw_text)
 
-            # 3. 구조화 데이터 저장
-            save_structured(structured_data, uploaded.name)
+                # 3. 구조화 데이터 저장
+                stats = save_structured(structured_data, uploaded.name, doc_id=doc_id)
 
-            st.success(f"✅ {len(structured_data)} 개 항목 저장 완료!")
+                st.success(f"✅ {stats['rows']} 개 항목 저장 완료! "
+                           f"({stats['seconds']:.2f}초, {stats['rows_per_sec']:.0f}행/초)")
 
 # -------------------------
 # 2️⃣ DB 조회/수정/삭제
 # -------------------------
 with tab2:
     st.subheader("📂 원문 목록")
-    orig_df = pd.read_sql("SELECT * FROM original_docs ORDER BY id DESC", get_conn())
+    with get_conn() as conn:
+        orig_df = pd.read_sql(
+            "SELECT id, filename, content_hash, size_bytes, created_at FROM original_docs ORDER BY id DESC", conn)
     st.dataframe(orig_df, use_container_width=True)
 
     st.subheader("📂 구조화 데이터")
-    df = pd.read_sql("SELECT * FROM structured_terms ORDER BY id DESC", get_conn())
+    c1, c2, c3 = st.columns([2, 2, 1])
+    kw_text = c1.text_input("키워드 (쉼표로 구분)")
+    rule_text = c2.text_input("규칙 검색", help="그냥 입력하면 부분 일치 (예: 재성 강). "
+                              "JSON 조각이나 \"따옴표 문자열\"은 정확히 일치 (예: {\"if\": \"재성이 강하면\"})")
+    match_all = c3.radio("조건", ["모두", "하나라도"], horizontal=True) == "모두"
+    page_size = st.select_slider("페이지 크기", [20, 50, 100, 200], value=50)
+
+    keywords = [k.strip() for k in kw_text.split(",") if k.strip()]
+    rules, rule_sub = None, None
+    if rule_text.strip():
+        try:
+            parsed = json.loads(rule_text)
+        except json.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, (dict, list, str)):
+            rules = parsed                # 정확히 일치 (@>, GIN)
+        else:
+            rule_sub = rule_text.strip()  # 부분 일치 (ILIKE, pg_trgm)
+    # 검색 조건이 바뀌면 첫 페이지부터
+    query_key = (kw_text, rule_text, match_all, page_size)
+    if st.session_state.get("terms_query") != query_key:
+        st.session_state.terms_query = query_key
+        st.session_state.terms_pages = [None]  # 각 페이지의 before_id
+    pages = st.session_state.terms_pages
+
+    with get_conn() as conn:
+        rows, next_before = find_terms(conn, keywords=keywords, rules=rules, rule_text=rule_sub,
+                                       match_all=match_all, limit=page_size, before_id=pages[-1])
+    df = pd.DataFrame(rows)
     edited_df = st.data_editor(df, num_rows="dynamic", use_container_width=True)
 
+    p1, p2, p3 = st.columns([1, 1, 4])
+    if p1.button("◀ 이전", disabled=len(pages) == 1):
+        pages.pop()
+        st.rerun()
+    if p2.button("다음 ▶", disabled=next_before is None):
+        pages.append(next_before)
+        st.rerun()
+    p3.caption(f"{len(pages)} 페이지 · {len(rows)}건")
+
     if st.button("💾 수정 저장"):
         with get_conn() as conn, conn.cursor() as cur:
             for _, row in edited_df.iterrows():
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Async, batched LLM rule extraction.
+
+Several sentences are packed into each chat request, many requests run at
+once under a concurrency cap and a token-bucket rate limit, and failed
+requests are retried with exponential backoff (full jitter, Retry-After
+honoured).  Results have the same JSON shape as extract_rule_advanced.
+
+Point ``base_url`` at scripts/stub_llm_server.py to run without the API.
+"""
+import asyncio, json, os, random, time
+from typing import Iterable, List, Union
+
+from .config import MODEL_NAME
+
+SYSTEM_PROMPT = (
+    "너는 명리학 문장에서 조건/결과 규칙을 뽑는 추출기다. "
+    "입력은 번호가 붙은 문장 목록이다. 각 문장마다 "
+    '{"i": 번호, "if": 조건, "then": 결과, "confidence": 0~1} 를 만들어 '
+    '{"rules": [...]} JSON 하나로만 답하라. 결과가 없으면 then은 "".'
+)
+
+class TokenBucket:
+    """
+    ``rate`` tokens per second, at most ``capacity`` saved up.
+
+    Reservation style: a caller takes its tokens at once (possibly going into
+    debt) and sleeps until the debt is repaid, so no lock is needed and the
+    bucket can outlive an event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._t = time.monotonic()
+
+    async def acquire(self, n: float = 1.0):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._t) * self.rate)
+        self._t = now
+        self._tokens -= n
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+class RetryableError(Exception):
+    def __init__(self, msg: str, retry_after: float = None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+class AsyncRuleExtractor:
+    def __init__(
+        self,
+        model: str = MODEL_NAME,
+        api_key: str = None,
+        base_url: str = None,
+        sentences_per_request: int = 8,
+        concurrency: int = 16,
+        requests_per_sec: float = 5.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 60.0,
+    ):
+        self.model = model
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.sentences_per_request = sentences_per_request
+        self.concurrency = concurrency
+        self.requests_per_sec = requests_per_sec
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        # shared by every call so the rate holds across run_pipeline batches
+        self.bucket = TokenBucket(requests_per_sec)
+
+    def _client(self):
+        try:
+            from openai import AsyncOpenAI
+        except Exception as e:
+            raise RuntimeError("openai 미설치: pip install openai") from e
+        # retries are ours (rate limit + backoff), not the SDK's
+        return AsyncOpenAI(api_key=self.api_key or "sk-stub", base_url=self.base_url,
+                           max_retries=0, timeout=self.timeout)
+
+    # ---- one request ----
+    async def _call(self, client, sentences: List[str]) -> List[dict]:
+        import openai
+        user = "\n".join(f"{i}. {s}" for i, s in enumerate(sentences, 1))
+        try:
+            resp = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                          {"role": "user", "content": user}],
+                temperature=0,
+                response_format={"type": "json_object"},
+            )
+        except (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError) as e:
+            try:
+                retry_after = float(e.response.headers.get("retry-after"))
+            except Exception:
+                retry_after = None
+            raise RetryableError(str(e), retry_after) from e
+        except openai.APIStatusError as e:
+            if e.status_code in (408, 409, 425) or e.status_code >= 500:
+                raise RetryableError(str(e)) from e
+            raise
+        try:
+            rules = json.loads(resp.choices[0].message.content)["rules"]
+            by_i = {int(r["i"]): r for r in rules}
+        except Exception as e:
+            raise RetryableError(f"응답 파싱 실패: {e}") from e
+        if len(by_i) < len(sentences):
+            raise RetryableError(f"응답 누락: {len(by_i)}/{len(sentences)}")
+        return [by_i[i] for i in range(1, len(sentences) + 1)]
+
+    async def _call_with_retry(self, client, sem, sentences):
+        attempt = 0
+        while True:
+            async with sem:
+                await self.bucket.acquire()
+                try:
+                    return await self._call(client, sentences)
+                except RetryableError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = e.retry_after
+            if delay is None:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    # ---- public ----
+    async def aextract(self, sentences: Iterable[str], source: str = "") -> List[Union[str, Exception]]:
+        """One JSON string per sentence, in input order (an Exception where a request gave up)."""
+        sentences = list(sentences)
+        n = self.sentences_per_request
+        groups = [sentences[i:i + n] for i in range(0, len(sentences), n)]
+        sem = asyncio.Semaphore(self.concurrency)
+        client = self._client()
+        try:
+            done = await asyncio.gather(
+                *(self._call_with_retry(client, sem, g) for g in groups),
+                return_exceptions=True,
+            )
+        finally:
+            await client.close()
+        out: List[Union[str, Exception]] = []
+        for g, res in zip(groups, done):
+            if isinstance(res, Exception):
+                out.extend([res] * len(g))
+                continue
+            for r in res:
+                then = str(r.get("then") or "").strip()
+                out.append(json.dumps({
+                    "if": str(r.get("if") or "").strip(),
+                    "then": then,
+                    "source": source,
+                    "confidence": float(r.get("confidence", 0.6 if then else 0.3)),
+                }, ensure_ascii=False))
+        return out
+
+    def extract(self, sentences: Iterable[str], source: str = "") -> List[Union[str, Exception]]:
+        return asyncio.run(self.aextract(sentences, source))
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Compact resume index for run_pipeline checkpoints.
+
+Next to <checkpoint>.jsonl (one extracted record per line) it keeps:
+- .state   small JSON: records written, sentences consumed (processed-offset
+           marker), and the byte sizes of the files (and of an appendable
+           output) at the last commit
+- .log     16-byte blake2b digests of recently committed source sentences
+- .sorted  sorted digests, memory-mapped and binary-searched on lookup
+
+Resuming reads .state, truncates anything written after the last commit and
+loads at most ``compact_every`` digests from .log (a longer log is merged
+into .sorted first); it never parses the records themselves.
+
+Lookups (``sentence in index``) only see sentences committed before this
+load, like the old in-memory ``seen`` set: a run never skips repeats of
+sentences it extracted itself, so its output does not depend on the batch
+size.  Digests committed during the run only go to .log, for the next resume.
+"""
+import hashlib, heapq, json, mmap, os
+from typing import Iterable, Iterator, List
+
+DIGEST_SIZE = 16
+COMPACT_EVERY = 1 << 18
+
+def sentence_digest(s: str) -> bytes:
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+def _iter_digests(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            d = f.read(DIGEST_SIZE)
+            if len(d) < DIGEST_SIZE:
+                break
+            yield d
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class CheckpointIndex:
+    def __init__(self, checkpoint_path: str, compact_every: int = COMPACT_EVERY):
+        self.path = checkpoint_path
+        self.state_path = checkpoint_path + ".state"
+        self.log_path = checkpoint_path + ".log"
+        self.sorted_path = checkpoint_path + ".sorted"
+        self.compact_every = compact_every
+        self.records = 0
+        self.consumed = 0
+        self.out_bytes = None  # output file size at the last commit (appendable sinks)
+        self._recent = set()
+        self._sorted = None  # mmap of .sorted (None when empty)
+
+    # ---- open / reset ----
+    def load(self):
+        """Open an existing checkpoint (or start an empty one)."""
+        if not os.path.exists(self.path):
+            self.reset()
+            return self
+        if not os.path.exists(self.state_path):
+            self._rebuild()
+        st = json.loads(open(self.state_path, "r", encoding="utf-8").read())
+        # drop whatever a crash left after the last committed batch
+        for p, size in ((self.path, st["ck_bytes"]), (self.log_path, st["log_bytes"])):
+            if os.path.exists(p) and os.path.getsize(p) > size:
+                with open(p, "r+b") as f:
+                    f.truncate(size)
+        self.records = st["records"]
+        self.consumed = st["consumed"]
+        self.out_bytes = st.get("out_bytes")
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.compact_every * DIGEST_SIZE:
+            self.compact()
+        self._recent = set(_iter_digests(self.log_path)) if os.path.exists(self.log_path) else set()
+        self._map_sorted()
+        return self
+
+    def reset(self):
+        self.close()
+        for p in (self.path, self.log_path, self.sorted_path):
+            if os.path.exists(p):
+                os.remove(p)
+        self.records = self.consumed = 0
+        self.out_bytes = None
+        self._recent = set()
+        self._save_state()
+        return self
+
+    def _rebuild(self):
+        # checkpoint written before the index existed: index it once; the
+        # offset is unknown, so resume falls back to digest lookups only
+        records, digests = 0, []
+        with open(self.path, "r", encoding="utf-8") as ck:
+            for line in ck:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                records += 1
+                digests.append(sentence_digest(rec.get("source_sent", "")))
+        _write_atomic(self.sorted_path, b"".join(sorted(set(digests))))
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self.records, self.consumed = records, 0
+        self._save_state()
+
+    def close(self):
+        if self._sorted is not None:
+            self._sorted.close()
+            self._sorted = None
+
+    # ---- lookup ----
+    def _map_sorted(self):
+        self.close()
+        if os.path.exists(self.sorted_path) and os.path.getsize(self.sorted_path):
+            with open(self.sorted_path, "rb") as f:
+                self._sorted = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _in_sorted(self, d: bytes) -> bool:
+        mm = self._sorted
+        if mm is None:
+            return False
+        lo, hi = 0, len(mm) // DIGEST_SIZE
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = mm[mid * DIGEST_SIZE:(mid + 1) * DIGEST_SIZE]
+            if cur < d:
+                lo = mid + 1
+            elif cur > d:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, sentence: str) -> bool:
+        d = sentence_digest(sentence)
+        return d in self._recent or self._in_sorted(d)
+
+    # ---- write ----
+    def commit(self, records: List[dict], consumed: int, out_bytes: int = None):
+        """Append a finished batch, then advance the offset marker (and the output size)."""
+        if records:
+            with open(self.path, "a", encoding="utf-8") as ck:
+                for r in records:
+                    ck.write(json.dumps(r, ensure_ascii=False) + "\n")
+            with open(self.log_path, "ab") as log:
+                log.write(b"".join(sentence_digest(r.get("source_sent", "")) for r in records))
+            self.records += len(records)
+        self.consumed = consumed
+        self.out_bytes = out_bytes
+        self._save_state()
+
+    def compact(self):
+        """Merge the digest log into the sorted file (external sort, ``compact_every`` digests at a time)."""
+        self.close()
+        runs, files = [], []
+        try:
+            chunk = []
+            for d in _iter_digests(self.log_path):
+                chunk.append(d)
+                if len(chunk) >= self.compact_every:
+                    runs.append(self._write_run(chunk, len(runs)))
+                    chunk = []
+            if chunk:
+                runs.append(self._write_run(chunk, len(runs)))
+            for p in ([self.sorted_path] if os.path.exists(self.sorted_path) else []) + runs:
+                files.append(open(p, "rb"))
+            tmp = self.sorted_path + ".tmp"
+            with open(tmp, "wb") as out:
+                last = None
+                for d in heapq.merge(*(iter(lambda f=f: f.read(DIGEST_SIZE), b"") for f in files)):
+                    if d != last:
+                        out.write(d)
+                        last = d
+        finally:
+            for f in files:
+                f.close()
+            for p in runs:
+                os.remove(p)
+        os.replace(tmp, self.sorted_path)
+        open(self.log_path, "wb").close()
+        self._save_state()
+
+    def _write_run(self, digests: List[bytes], n: int) -> str:
+        path = f"{self.sorted_path}.run{n}"
+        with open(path, "wb") as f:
+            f.write(b"".join(sorted(digests)))
+        return path
+
+    def _save_state(self):
+        size = lambda p: os.path.getsize(p) if os.path.exists(p) else 0
+        st = {"records": self.records, "consumed": self.consumed, "out_bytes": self.out_bytes,
+              "ck_bytes": size(self.path), "log_bytes": size(self.log_path)}
+        _write_atomic(self.state_path, json.dumps(st).encode("utf-8"))
+
+    # ---- read back ----
+    def iter_records(self) -> Iterable[dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as ck:
+            for line in ck:
+                try:
+                    yield json.loads(line)
+                except Exception:
+                    pass
@@ -1,10 +1,58 @@
 # -*- coding: utf-8 -*-
-from typing import Iterable
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+from normalization.trie import trie_pattern
 
 KEYWORDS = ["면","경우","허투","보면","없으면","되면","강하면","약하면",
             "제압","穿","破","沖","合","墓","庫"]
 
-def filter_stream(sent_iter: Iterable[str]) -> Iterable[str]:
+Match = Tuple[int, str]  # (start offset, keyword)
+
+class KeywordMatcher:
+    """
+    All keywords compiled into one trie-shaped regex.
+
+    search() decides in a single scan; finditer() reports every occurrence of
+    every keyword (overlaps included) as (start, keyword), in text order.
+    """
+
+    def __init__(self, keywords: Iterable[str] = KEYWORDS):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        kw = set(self.keywords)
+        pat = trie_pattern(self.keywords) if self.keywords else r"(?!)"
+        self._any = re.compile(pat)
+        # zero-width lookahead finds the longest keyword at every start
+        # offset; keywords that are prefixes of it start there as well
+        self._all = re.compile(f"(?=({pat}))")
+        self._prefixes = {k: [k[:i] for i in range(1, len(k)) if k[:i] in kw]
+                          for k in self.keywords}
+
+    def search(self, s: str) -> bool:
+        return self._any.search(s) is not None
+
+    def finditer(self, s: str) -> Iterator[Match]:
+        for m in self._all.finditer(s):
+            i, longest = m.start(), m.group(1)
+            for k in self._prefixes[longest]:
+                yield (i, k)
+            yield (i, longest)
+
+    def matches(self, s: str) -> List[Match]:
+        return list(self.finditer(s))
+
+DEFAULT_MATCHER = KeywordMatcher(KEYWORDS)
+
+def filter_stream(sent_iter: Iterable[str], matcher: KeywordMatcher = None) -> Iterable[str]:
+    m = matcher or DEFAULT_MATCHER
     for s in sent_iter:
-        if any(k in s for k in KEYWORDS):
+        if m.search(s):
             yield s
+
+def filter_matches(sent_iter: Iterable[str], matcher: KeywordMatcher = None) -> Iterable[Tuple[str, List[Match]]]:
+    """Like filter_stream, but also yields the keyword matches of each sentence."""
+    m = matcher or DEFAULT_MATCHER
+    for s in sent_iter:
+        found = m.matches(s)
+        if found:
+            yield s, found
@@ -1,17 +1,24 @@
 import os
+import json
+import zlib
+import hashlib
+from io import StringIO
+from time import perf_counter
 import psycopg2
-from psycopg2.extras import Json
+from psycopg2.extras import RealDictCursor, execute_values
+
+from db_pool import get_pool
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 def get_conn():
-    return psycopg2.connect(DATABASE_URL)
+    """풀에서 빌린 연결 (with 블록 종료 시 커밋 후 반납)."""
+    return get_pool(DATABASE_URL).connection()
 
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
+JSONB_COLUMNS = ("keywords", "rules", "examples")
 
-    # 원문 보관함
+def create_schema(cur):
+    # 원문 보관함 (content_hash로 중복 제거, 본문은 zlib 압축해 content_z에)
     cur.execute("""
     CREATE TABLE IF NOT EXISTS original_docs (
         id SERIAL PRIMARY KEY,
@@ -20,6 +27,13 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
+    cur.execute("""
+    ALTER TABLE original_docs
+        ADD COLUMN IF NOT EXISTS content_hash TEXT,
+        ADD COLUMN IF NOT EXISTS content_z BYTEA,
+        ADD COLUMN IF NOT EXISTS size_bytes INTEGER
+    """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS original_docs_content_hash ON original_docs (content_hash)")
 
     # 구조화 데이터
     cur.execute("""
@@ -36,6 +50,210 @@ def init_db():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
+    cur.execute("ALTER TABLE structured_terms ADD COLUMN IF NOT EXISTS doc_id INTEGER REFERENCES original_docs(id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS structured_terms_doc_id ON structured_terms (doc_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS structured_terms_term ON structured_terms (term)")
+    # 포함(@>) 검색용 GIN 인덱스; jsonb_path_ops는 @>만 지원하지만 더 작고 빠름
+    for col in JSONB_COLUMNS:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS structured_terms_{col}_gin "
+                    f"ON structured_terms USING GIN ({col} jsonb_path_ops)")
+    # 규칙 부분 문자열 검색(ILIKE)용 trigram 인덱스; 확장을 만들 권한이 없으면 인덱스 없이 동작
+    cur.execute("SAVEPOINT trgm")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute("CREATE INDEX IF NOT EXISTS structured_terms_rules_trgm "
+                    "ON structured_terms USING GIN ((rules::text) gin_trgm_ops)")
+        cur.execute("RELEASE SAVEPOINT trgm")
+    except psycopg2.Error:
+        cur.execute("ROLLBACK TO SAVEPOINT trgm")
+
+def init_db():
+    with get_conn() as conn, conn.cursor() as cur:
+        create_schema(cur)
+
+# =========================
+# 원문 (내용 해시 중복 제거 + 압축)
+# =========================
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def compress_content(content):
+    return zlib.compress(content.encode("utf-8"), 6)
+
+def save_original(conn, filename, content):
+    """
+    같은 내용이 이미 있으면 그 id를, 없으면 새로 넣은 id를 돌려줌.
+    반환: (doc_id, created)
+    """
+    h = content_hash(content)
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO original_docs (filename, content_hash, content_z, size_bytes)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash) DO NOTHING
+            RETURNING id
+        """, (filename, h, compress_content(content), len(content.encode("utf-8"))))
+        row = cur.fetchone()
+        if row:
+            return row[0], True
+        cur.execute("SELECT id FROM original_docs WHERE content_hash = %s", (h,))
+        return cur.fetchone()[0], False
+
+def load_original(conn, doc_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT content, content_z FROM original_docs WHERE id = %s", (doc_id,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    content, z = row
+    # 해시 도입 전에 저장된 행은 content에 평문이 있음
+    return zlib.decompress(bytes(z)).decode("utf-8") if z is not None else content
+
+def count_terms(conn, doc_id):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM structured_terms WHERE doc_id = %s", (doc_id,))
+        return cur.fetchone()[0]
+
+# =========================
+# 구조화 데이터 조회 (JSONB 포함 검색 + 키셋 페이지네이션)
+# =========================
+PAGE_SIZE = 50
+
+def _contains(col, values, match_all):
+    """col @> 조건. 모두 포함이면 배열 하나로, 하나라도면 값마다 @>를 OR (둘 다 GIN 인덱스를 탐)"""
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    if match_all:
+        return f"{col} @> %s::jsonb", [json.dumps(list(values), ensure_ascii=False)]
+    cond = " OR ".join([f"{col} @> %s::jsonb"] * len(values))
+    return f"({cond})", [json.dumps([v], ensure_ascii=False) for v in values]
+
+def _like_pattern(text):
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def find_terms(conn, keywords=None, rules=None, examples=None, term=None, source_file=None,
+               match_all=True, limit=PAGE_SIZE, before_id=None, rule_text=None):
+    """
+    keywords/rules/examples를 포함(@>)하는 structured_terms를 id 내림차순으로 limit개.
+    @>는 정확히 일치: rules 항목이 문자열이면 그와 같은 배열 원소, dict 조각
+    (예: {"if": "재성이 강하면"})이면 그 키·값을 모두 가진 규칙만 찾는다.
+    rule_text는 규칙(JSON 텍스트)에 부분 문자열로 들어 있으면 찾음 (ILIKE, pg_trgm 인덱스).
+    match_all=False면 값 중 하나라도 포함하면 됨.
+    다음 페이지는 before_id=반환된 next_before_id로 요청 (없으면 None).
+    반환: (rows(dict 목록), next_before_id)
+    """
+    where, params = [], []
+    for col, values in (("keywords", keywords), ("rules", rules), ("examples", examples)):
+        if values:
+            cond, p = _contains(col, values, match_all)
+            where.append(cond)
+            params += p
+    if rule_text:
+        where.append("rules::text ILIKE %s")
+        params.append(_like_pattern(rule_text))
+    if term:
+        where.append("term = %s")
+        params.append(term)
+    if source_file:
+        where.append("source_file = %s")
+        params.append(source_file)
+    if before_id is not None:
+        where.append("id < %s")
+        params.append(before_id)
+    sql = "SELECT * FROM structured_terms"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT %s"
+    params.append(limit + 1)
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(sql, params)
+        rows = [dict(r) for r in cur.fetchall()]
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]["id"]
+    return rows, None
+
+# =========================
+# 대량 적재 (COPY / execute_values)
+# =========================
+TERM_COLUMNS = ("category", "term", "definition", "explanation",
+                "examples", "rules", "keywords", "source_file", "doc_id")
+DOC_COLUMNS = ("filename", "content_hash", "content_z", "size_bytes")
+BATCH_SIZE = 5000
+
+def _copy_field(v):
+    if v is None:
+        return r"\N"
+    if isinstance(v, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(v).hex()  # bytea 16진 표기 (COPY에서 역슬래시는 이중)
+    return (str(v).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+def _batches(rows, n):
+    batch = []
+    for r in rows:
+        batch.append(r)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def bulk_load(conn, table, columns, rows, batch_size=BATCH_SIZE, method="copy"):
+    """
+    rows(튜플 iterable)를 한 트랜잭션으로 적재. method="copy"는 COPY FROM STDIN,
+    "values"는 다중 행 INSERT(execute_values). 실패하면 전부 롤백.
+    반환: {"rows", "seconds", "rows_per_sec"}
+    """
+    cols = ", ".join(columns)
+    total, t0 = 0, perf_counter()
+    try:
+        with conn.cursor() as cur:
+            for batch in _batches(rows, batch_size):
+                if method == "copy":
+                    buf = StringIO()
+                    for r in batch:
+                        buf.write("\t".join(_copy_field(v) for v in r) + "\n")
+                    buf.seek(0)
+                    cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN", buf)
+                elif method == "values":
+                    execute_values(cur, f"INSERT INTO {table} ({cols}) VALUES %s",
+                                   batch, page_size=batch_size)
+                else:
+                    raise ValueError(f"알 수 없는 적재 방식: {method}")
+                total += len(batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    sec = perf_counter() - t0
+    return {"rows": total, "seconds": sec, "rows_per_sec": total / sec if sec else 0.0}
+
+def term_rows(data, source_file, doc_id=None):
+    for item in data:
+        yield (
+            item.get("category"), item.get("term"), item.get("definition"),
+            item.get("explanation"),
+            json.dumps(item.get("examples", []), ensure_ascii=False),
+            json.dumps(item.get("rules", []), ensure_ascii=False),
+            json.dumps(item.get("keywords", []), ensure_ascii=False),
+            source_file,
+            doc_id,
+        )
+
+def bulk_insert_terms(conn, data, source_file, doc_id=None, **kwargs):
+    return bulk_load(conn, "structured_terms", TERM_COLUMNS,
+                     term_rows(data, source_file, doc_id), **kwargs)
 
-    conn.commit()
-    conn.close()
+def bulk_insert_docs(conn, docs, **kwargs):
+    """docs: (filename, content) 쌍들. 이미 있는 내용(또는 목록 안의 중복)은 건너뜀."""
+    rows = {}
+    for filename, content in docs:
+        h = content_hash(content)
+        if h not in rows:
+            rows[h] = (filename, h, compress_content(content), len(content.encode("utf-8")))
+    if rows:
+        with conn.cursor() as cur:
+            cur.execute("SELECT content_hash FROM original_docs WHERE content_hash = ANY(%s)", (list(rows),))
+            for (h,) in cur.fetchall():
+                del rows[h]
+    return bulk_load(conn, "original_docs", DOC_COLUMNS, rows.values(), **kwargs)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Near-duplicate grouping of extracted rules (MinHash + LSH).
+
+Each rule's if/then text (run_pipeline "if"/"then" or case_parser
+"condition"/"result") is normalized (canon_hanja, punctuation and whitespace
+dropped, casefolded), shingled into character 3-grams and MinHashed.  The
+signatures are split into LSH bands, so a new rule is only compared with the
+group representatives that share a band bucket with it: grouping is
+near-linear in the number of rules instead of quadratic.  The first rule of a
+group is its canonical representative.
+
+  dedupe_rules(records)      -> canonical records, each with "sources" (batch)
+  iter_dedupe(records)       -> (record, canonical link or None) per record (streaming)
+  DedupeSink(sink, links)    -> run_pipeline sink that drops near-duplicates
+                                and writes their links to ``links``
+
+  python dedupe.py output/rules_output.jsonl -o output/rules_dedup.jsonl
+"""
+import argparse, hashlib, json, re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from normalization.hanja_norm import canon_hanja
+
+THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE = 3
+
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32; a*h+b stays below 2**64
+_DROP = re.compile(r"[\W_]+")
+LINK_FIELDS = ("id", "source", "source_sent")
+
+def rule_text(rec: dict) -> str:
+    cond = rec.get("if", rec.get("condition")) or ""
+    then = rec.get("then", rec.get("result")) or ""
+    return _DROP.sub("", canon_hanja(f"{cond} {then}")).casefold()
+
+def _link(rec: dict) -> dict:
+    return {k: rec[k] for k in LINK_FIELDS if rec.get(k) is not None}
+
+def _choose_bands(num_perm: int, threshold: float) -> int:
+    # b bands of r rows make a pair a candidate with probability 1-(1-s**r)**b;
+    # pick the split with the least missed mass above the threshold plus
+    # candidate mass below it (candidates are verified afterwards anyway)
+    def miss(b):
+        r = num_perm // b
+        p = lambda s: 1 - (1 - s ** r) ** b
+        grid = [i / 100 for i in range(101)]
+        fp = sum(p(s) for s in grid if s < threshold)
+        fn = sum(1 - p(s) for s in grid if s >= threshold)
+        return 0.5 * fp + 2.0 * fn
+    return min((b for b in range(1, num_perm + 1) if num_perm % b == 0), key=miss)
+
+class NearDupIndex:
+    """Groups texts whose estimated Jaccard similarity (of shingles) reaches ``threshold``."""
+
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = None,
+                 shingle: int = SHINGLE, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands or _choose_bands(num_perm, threshold)
+        if num_perm % self.bands:
+            raise ValueError(f"num_perm {num_perm} is not divisible by bands {self.bands}")
+        self.rows = num_perm // self.bands
+        self.shingle = shingle
+        rnd = np.random.default_rng(seed)
+        self._a = rnd.integers(1, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+        self._b = rnd.integers(0, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._sigs: List[np.ndarray] = []   # one per group (its canonical)
+        self.meta: List[dict] = []          # canonical link per group
+
+    def signature(self, text: str) -> np.ndarray:
+        k = self.shingle
+        grams = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+        h = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little")
+             for g in grams),
+            dtype=np.uint64, count=len(grams))
+        return ((self._a * h + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def _bands(self, sig: np.ndarray):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, text: str, meta: dict = None) -> Tuple[int, bool]:
+        """Return (group id, True if this text started a new group)."""
+        sig = self.signature(text)
+        keys = self._bands(sig)
+        best, best_sim = -1, self.threshold
+        seen = set()
+        for bucket, key in zip(self._buckets, keys):
+            for gid in bucket.get(key, ()):
+                if gid in seen:
+                    continue
+                seen.add(gid)
+                sim = float(np.mean(self._sigs[gid] == sig))
+                if sim >= best_sim:
+                    best, best_sim = gid, sim
+        if best >= 0:
+            return best, False
+        gid = len(self._sigs)
+        self._sigs.append(sig)
+        self.meta.append(meta or {})
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(gid)
+        return gid, True
+
+    def __len__(self):
+        return len(self._sigs)
+
+def iter_dedupe(records: Iterable[dict], index: NearDupIndex = None) -> Iterator[Tuple[dict, Optional[dict]]]:
+    """
+    Streaming: (record, None) for the first record of a group, (record, link to
+    the group's canonical) for a near-duplicate.  Records without if/then text
+    are never grouped.
+    """
+    index = index if index is not None else NearDupIndex()
+    for rec in records:
+        text = rule_text(rec)
+        if not text:
+            yield rec, None
+            continue
+        gid, new = index.add(text, _link(rec))
+        yield rec, (None if new else index.meta[gid])
+
+def dedupe_rules(records: Iterable[dict], index: NearDupIndex = None) -> List[dict]:
+    """Batch: canonical records in first-seen order, each with "sources" listing its whole group."""
+    index = index if index is not None else NearDupIndex()
+    out, groups = [], {}
+    for rec in records:
+        text = rule_text(rec)
+        gid, new = index.add(text, _link(rec)) if text else (None, True)
+        if new or gid not in groups:
+            rec = dict(rec)
+            rec["sources"] = [_link(rec)]
+            out.append(rec)
+            if gid is not None:
+                groups[gid] = rec
+        else:
+            groups[gid]["sources"].append(_link(rec))
+    return out
+
+class DedupeSink:
+    """
+    Wraps a run_pipeline sink: canonical records go to ``sink``, near-duplicates
+    only to ``links`` as {"canonical_id", "id", "source", "source_sent"}.
+    """
+
+    def __init__(self, sink, links, index: NearDupIndex = None):
+        self.sink = sink
+        self.links = links
+        self.index = index if index is not None else NearDupIndex()
+        self.duplicates = 0
+
+    @property
+    def count(self):
+        return self.sink.count
+
+    def write(self, records: Iterable[dict]):
+        keep, dups = [], []
+        for rec, canon in iter_dedupe(records, self.index):
+            if canon is None:
+                keep.append(rec)
+            else:
+                dups.append({"canonical_id": canon.get("id"), **_link(rec)})
+        self.sink.write(keep)
+        self.links.write(dups)
+        self.duplicates += len(dups)
+
+    def close(self):
+        self.sink.close()
+        self.links.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_records(path: str) -> Iterator[dict]:
+    from sinks import iter_jsonl
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+    else:
+        yield from iter_jsonl(path)
+
+if __name__ == "__main__":
+    from sinks import open_sink
+    ap = argparse.ArgumentParser(description="Group near-duplicate rules (MinHash/LSH)")
+    ap.add_argument("input", help=".json array (run_pipeline) or .jsonl(.gz) (run_pipeline / case_parser.save_cases)")
+    ap.add_argument("-o", "--output", required=True, help="sink by extension, as in run_pipeline")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    ap.add_argument("--num-perm", type=int, default=NUM_PERM)
+    ap.add_argument("--stream", action="store_true",
+                    help="write canonicals as they appear and near-duplicate links to "
+                         "<output>.duplicates.jsonl instead of collecting groups in memory")
+    args = ap.parse_args()
+    index = NearDupIndex(args.threshold, args.num_perm)
+    if args.stream:
+        links_path = re.sub(r"(\.[^./\\]+)+$", "", args.output) + ".duplicates.jsonl"
+        with DedupeSink(open_sink(args.output), open_sink(links_path), index) as sink:
+            for rec in _read_records(args.input):
+                sink.write([rec])
+        print(f"✅ {sink.count}개 대표 규칙, 중복 {sink.duplicates}개 → {args.output}, {links_path}")
+    else:
+        rules = dedupe_rules(_read_records(args.input), index)
+        with open_sink(args.output) as sink:
+            sink.write(rules)
+        print(f"✅ {sum(len(r['sources']) for r in rules)}개 → {len(rules)}개 대표 규칙 → {args.output}")
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of normalized documents.
+
+key = sha256(file bytes) + maps_version()  (variant/reading maps + normalizer)
+entry = <cache_dir>/<key>.txt, the UTF-8 output of parse_file
+
+A hit skips parse_file entirely and serves the text from a memory-mapped
+file.  Entries are evicted least-recently-used first (mtime is touched on
+every hit) once the directory grows past ``max_bytes``.
+"""
+import codecs, hashlib, mmap, os
+from pathlib import Path
+from typing import Iterator, Optional
+
+from file_parser import CHUNK_CHARS, iter_file
+from normalization.hanja_norm import maps_version
+
+CACHE_DIR = os.getenv("DOC_CACHE_DIR", "intermediate/doc_cache")
+CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_BYTES", str(2 << 30)))
+_EMPTY = b""
+
+def file_digest(path_like, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path_like, "rb") as f:
+        while True:
+            b = f.read(block)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+class DocCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key(self, path_like) -> str:
+        return f"{file_digest(path_like)}-{maps_version()}"
+
+    def _entry(self, key: str) -> Path:
+        return self.dir / f"{key}.txt"
+
+    def open(self, key: str) -> Optional[mmap.mmap]:
+        """Memory-map a cached entry (None on miss); the caller closes it."""
+        p = self._entry(key)
+        try:
+            with open(p, "rb") as f:
+                os.utime(p)  # LRU stamp
+                if os.fstat(f.fileno()).st_size == 0:
+                    return _EMPTY  # mmap cannot map an empty file
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, pieces) -> Iterator[str]:
+        """Pass ``pieces`` through while writing them to the entry for ``key``."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        final = self._entry(key)
+        tmp = final.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                for piece in pieces:
+                    f.write(piece)
+                    yield piece
+            os.replace(tmp, final)  # only complete entries become visible
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for p in self.dir.glob("*.txt"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+
+def _decode_mapped(mm, chunk_bytes: int) -> Iterator[str]:
+    dec = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for i in range(0, len(mm), chunk_bytes):
+            s = dec.decode(mm[i:i + chunk_bytes])
+            if s:
+                yield s
+        s = dec.decode(b"", final=True)
+        if s:
+            yield s
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+
+def iter_file_cached(path_like, chunk_chars: int = CHUNK_CHARS, workers: int = 1,
+                     cache: Optional[DocCache] = None) -> Iterator[str]:
+    """iter_file through the cache: same pieces joined, parse skipped on a hit."""
+    cache = cache or DocCache()
+    key = cache.key(path_like)
+    mm = cache.open(key)
+    if mm is not None:
+        return _decode_mapped(mm, chunk_chars)
+    return cache.store(key, iter_file(path_like, chunk_chars=chunk_chars, workers=workers))
+
+def parse_file_cached(path_like, cache: Optional[DocCache] = None) -> str:
+    """parse_file through the cache."""
+    cache = cache or DocCache()
+    key = cache.key(path_like)
+    mm = cache.open(key)
+    if mm is None:
+        return "".join(cache.store(key, iter_file(path_like)))
+    try:
+        with memoryview(mm) as mv:
+            return str(mv, "utf-8")
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
@@ -1,20 +1,50 @@
 # -*- coding: utf-8 -*-
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from itertools import islice
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, List
 import re
 
-from normalization.hanja_norm import normalize_for_index
+from normalization.hanja_norm import normalize_for_index, normalize_stream
+
+CHUNK_CHARS = 1 << 20  # iter_file read size (characters)
+PDF_PAGES_PER_TASK = 8  # pages per process-pool task in _iter_pdf
 
 def _read_txt(p: Path) -> str:
     return p.read_text(encoding="utf-8", errors="ignore")
 
+def _iter_txt(p: Path, chunk_chars: int) -> Iterator[str]:
+    with open(p, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                break
+            yield chunk
+
 def _read_docx(p: Path) -> str:
+    return "".join(_iter_docx(p))
+
+def _iter_docx(p: Path) -> Iterator[str]:
     try:
         from docx import Document
     except Exception as e:
         raise RuntimeError("python-docx 미설치: pip install python-docx") from e
-    doc = Document(str(p))
-    return "\n".join(par.text for par in doc.paragraphs)
+    from docx.oxml.ns import qn
+    from docx.text.paragraph import Paragraph
+    body = Document(str(p))._body
+    # same paragraphs as Document.paragraphs (direct w:p children of the body)
+    # but wrapped one at a time; a paragraph carrying w:sectPr closes a
+    # section, and each section is yielded as soon as it is complete
+    section, sep = [], ""
+    for el in body._element.iterchildren(qn("w:p")):
+        section.append(Paragraph(el, body).text)
+        if el.xpath("./w:pPr/w:sectPr"):
+            yield sep + "\n".join(section)
+            section, sep = [], "\n"
+    if section:
+        yield sep + "\n".join(section)
 
 def _read_pdf(p: Path) -> str:
     try:
@@ -23,6 +53,72 @@ def _read_pdf(p: Path) -> str:
         raise RuntimeError("pdfminer.six 미설치: pip install pdfminer.six") from e
     return extract_text(str(p))
 
+def _pdf_pages(path: str, start: int = 0, stop: int = 0) -> Iterator[str]:
+    # mirrors pdfminer.high_level.extract_text, but hands out the converter
+    # output after every page (each page ends with the "\f" it writes)
+    try:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+    except Exception as e:
+        raise RuntimeError("pdfminer.six 미설치: pip install pdfminer.six") from e
+    pagenos = range(start, stop) if stop else None
+    with open(path, "rb") as fp, StringIO() as out:
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, out, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(fp, pagenos, maxpages=stop, caching=True):
+            interpreter.process_page(page)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate(0)
+
+def _pdf_page_range(path: str, start: int, stop: int) -> List[str]:
+    return list(_pdf_pages(path, start, stop))
+
+def _pdf_page_count(path: str) -> int:
+    try:
+        from pdfminer.pdfpage import PDFPage
+    except Exception as e:
+        raise RuntimeError("pdfminer.six 미설치: pip install pdfminer.six") from e
+    with open(path, "rb") as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+def _iter_pdf(p: Path, workers: int = 1) -> Iterator[str]:
+    """Yield page texts in order; "".join(...) == _read_pdf(p)."""
+    if workers <= 1:
+        yield from _pdf_pages(str(p))
+        return
+    n = _pdf_page_count(str(p))
+    ranges = iter([(s, min(s + PDF_PAGES_PER_TASK, n)) for s in range(0, n, PDF_PAGES_PER_TASK)])
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        # keep a bounded window of page ranges in flight, consume in order
+        pending = deque(ex.submit(_pdf_page_range, str(p), a, b)
+                        for a, b in islice(ranges, 2 * workers))
+        while pending:
+            pages = pending.popleft().result()
+            nxt = next(ranges, None)
+            if nxt is not None:
+                pending.append(ex.submit(_pdf_page_range, str(p), *nxt))
+            yield from pages
+
+def iter_pages(path_like, workers: int = 1) -> Iterator[str]:
+    """
+    Raw (un-normalized) text as it is decoded: pages for PDF (optionally
+    spread over ``workers`` processes), sections for DOCX, chunks for TXT.
+    Always in document order, and "".join(...) matches the serial reader.
+    """
+    p = Path(path_like)
+    ext = p.suffix.lower()
+    if ext == ".txt":
+        return _iter_txt(p, CHUNK_CHARS)
+    elif ext == ".docx":
+        return _iter_docx(p)
+    elif ext == ".pdf":
+        return _iter_pdf(p, workers)
+    raise ValueError(f"지원하지 않는 형식: {ext}")
+
 def parse_file(path_like) -> str:
     p = Path(path_like)
     ext = p.suffix.lower()
@@ -36,6 +132,21 @@ def parse_file(path_like) -> str:
         raise ValueError(f"지원하지 않는 형식: {ext}")
     return normalize_for_index(raw)
 
+def iter_file(path_like, chunk_chars: int = CHUNK_CHARS, workers: int = 1) -> Iterator[str]:
+    """
+    Iterator mode of parse_file: read and normalize in chunks (PDF pages
+    may be decoded by ``workers`` processes).
+
+    "".join(iter_file(p)) == parse_file(p); peak memory stays around one
+    chunk instead of several full-text copies.
+    """
+    p = Path(path_like)
+    if p.suffix.lower() == ".txt":
+        raw = _iter_txt(p, chunk_chars)
+    else:
+        raw = iter_pages(p, workers=workers)
+    return normalize_stream(raw, max_buffer=4 * chunk_chars)
+
 # 문장 스트림 (여기 한 곳에서만 제공)
 _SENT_SPLIT = re.compile(r'(?<=[다요음함\.!\?])\s+')
 def yield_sentences(text: str) -> Iterable[str]:
@@ -44,3 +155,28 @@ def yield_sentences(text: str) -> Iterable[str]:
         s = s.strip()
         if len(s) > 1:
             yield s
+
+# greedy prefix up to the end of the last sentence break (backtracks from the end)
+_LAST_SPLIT = re.compile(r'.*(?<=[다요음함\.!\?])\s+', re.DOTALL)
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Lazy yield_sentences over text chunks (e.g. iter_file output): the text
+    up to the last sentence break of each buffer is split right away, the
+    unfinished sentence is carried into the next chunk.  Same sentences as
+    yield_sentences("".join(chunks)).
+    """
+    tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf = tail + chunk if tail else chunk
+        # raw text: a whitespace run at the very end may still continue
+        m = _LAST_SPLIT.match(buf)
+        if m:
+            yield from yield_sentences(buf[:m.end()])
+            tail = buf[m.end():]
+        else:
+            tail = buf
+    if tail:
+        yield from yield_sentences(tail)
@@ -5,16 +5,25 @@ Replace `extract_rule_advanced` with your model call if needed.
 """
 import json
 
-def extract_rule_advanced(sentence: str, source: str = "") -> str:
+def _marker(sentence: str, matches, kw: str) -> int:
+    # reuse condition_filter match offsets when given; the matcher may have
+    # been built without this keyword, so a miss still falls back to find()
+    if matches:
+        i = next((i for i, k in matches if k == kw), -1)
+        if i >= 0:
+            return i
+    return sentence.find(kw)
+
+def extract_rule_advanced(sentence: str, source: str = "", matches=None) -> str:
     # Minimal heuristic: split by '면' or '경우' as IF/THEN marker
-    if "면" in sentence:
-        parts = sentence.split("면", 1)
-        cond = parts[0].strip()
-        then = parts[1].strip()
-    elif "경우" in sentence:
-        parts = sentence.split("경우", 1)
-        cond = parts[0].strip()
-        then = parts[1].strip()
+    i = _marker(sentence, matches, "면")
+    kw = "면"
+    if i < 0:
+        i = _marker(sentence, matches, "경우")
+        kw = "경우"
+    if i >= 0:
+        cond = sentence[:i].strip()
+        then = sentence[i + len(kw):].strip()
     else:
         cond = sentence.strip()
         then = ""
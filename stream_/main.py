@@ -1,7 +1,7 @@
 import os
 import sys
 from pathlib import Path
-from parser import parse_file
+from doc_cache import parse_file_cached as parse_file
 from normalization.hanja_norm import normalize_hanja
 from condition_filter import filter_sentences
 from gpt_extractor_v2 import extract_rules
@@ -4,33 +4,299 @@ Hanja normalization utilities:
 - canon_hanja: fold compatibility/variant forms (禄, 祿 -> 祿)
 - annotate_readings: attach [hangul] reading to key Hanja for indexing (e.g., 祿[록])
 - normalize_for_index: convenience pipeline
+- normalize_stream: normalize_for_index over an iterator of text chunks
+- maps_version: stamp of the maps + normalizer, for caches of normalized text
+- write_snapshot: compile the maps into the binary snapshot (scripts/hanja_maps.py)
+- maps_changed: call after changing a VAR target in place
+
+The maps are loaded on first use, not at import.  When resources/ holds a
+current snapshot (hanja_maps.snapshot, checked against the JSON sources) it is
+memory-mapped and only the section a call needs is decoded: the precompiled
+variant matcher for canon_hanja, the reading map for annotate_readings, and
+nothing at all for maps_version.  Otherwise the JSON files are read.  VAR and
+READ stay available as module attributes (materialized on access).
 """
-import json, re, unicodedata
+import hashlib, json, marshal, mmap, os, re, struct, unicodedata
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from normalization.trie import key_trie, next_key_in, trie_pattern
 
 _RES = Path(__file__).resolve().parents[1] / "resources"
+_SOURCES = {"var": "hanja_variant_map.json",   # variant -> canonical hanja
+            "read": "hanja_reading_map.json"}  # hanja -> [readings]
+SNAPSHOT_PATH = _RES / "hanja_maps.snapshot"
 
 def _load(name):
     with open(_RES / name, "r", encoding="utf-8") as f:
         return json.load(f)
 
-VAR = _load("hanja_variant_map.json")   # variant -> canonical hanja
-READ = _load("hanja_reading_map.json")  # hanja -> [readings]
+# bump when normalize_for_index output changes for the same maps
+NORMALIZER_VERSION = 1
+
+def _stamp(var: dict, read: dict) -> str:
+    blob = json.dumps([NORMALIZER_VERSION, var, read], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+def maps_version() -> str:
+    """Short digest of VAR, READ and NORMALIZER_VERSION."""
+    g = globals()
+    if "VAR" not in g and "READ" not in g:
+        snap = _snapshot()
+        if snap is not None:
+            return snap.header["maps_version"]
+    return _stamp(_maps("VAR"), _maps("READ"))
+
+# ---- lazy maps / binary snapshot ----
+# Snapshot layout: magic, u32 header length, JSON header (stamps, source
+# file stats and digests, section offsets), then marshal-encoded sections.
+
+_MAGIC = b"HJMAPS\x00\x01"
+_NOT_LOADED = object()
+_SNAPSHOT = _NOT_LOADED
+
+class _Snapshot:
+    def __init__(self, mm: mmap.mmap, header: dict):
+        self.mm = mm
+        self.header = header
+
+    def section(self, name: str):
+        off, size = self.header["sections"][name]
+        return marshal.loads(self.mm[off:off + size])
+
+def _source_info(name: str, with_digest: bool = True) -> dict:
+    path = _RES / name
+    st = path.stat()
+    info = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if with_digest:
+        info["sha1"] = hashlib.sha1(path.read_bytes()).hexdigest()
+    return info
+
+def _snapshot_current(header: dict) -> bool:
+    if header.get("format") != 1 or header.get("normalizer_version") != NORMALIZER_VERSION:
+        return False
+    for key, name in _SOURCES.items():
+        want = header["sources"][key]
+        have = _source_info(name, with_digest=False)
+        if have == {"size": want["size"], "mtime_ns": want["mtime_ns"]}:
+            continue
+        # touched (e.g. by a checkout): still current if the bytes are the same
+        if have["size"] != want["size"] or _source_info(name)["sha1"] != want["sha1"]:
+            return False
+    return True
+
+def _snapshot():
+    """The mapped snapshot, or None when missing, unreadable or stale."""
+    global _SNAPSHOT
+    if _SNAPSHOT is _NOT_LOADED:
+        _SNAPSHOT = None
+        try:
+            with open(SNAPSHOT_PATH, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            n = len(_MAGIC)
+            if mm[:n] == _MAGIC:
+                (hlen,) = struct.unpack("<I", mm[n:n + 4])
+                header = json.loads(mm[n + 4:n + 4 + hlen].decode("utf-8"))
+                if _snapshot_current(header):
+                    _SNAPSHOT = _Snapshot(mm, header)
+        except (OSError, ValueError, KeyError):
+            pass
+    return _SNAPSHOT
+
+def _maps(name: str):
+    """VAR or READ, loading (and caching as a module attribute) on first use."""
+    g = globals()
+    if name not in g:
+        snap = _snapshot()
+        key = name.lower()
+        g[name] = snap.section(key) if snap is not None else _load(_SOURCES[key])
+    return g[name]
+
+def __getattr__(name):
+    if name in ("VAR", "READ"):
+        return _maps(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def write_snapshot(path=SNAPSHOT_PATH) -> dict:
+    """Compile the JSON maps (as they are on disk) into the binary snapshot; returns its header."""
+    global _SNAPSHOT
+    var, read = _load(_SOURCES["var"]), _load(_SOURCES["read"])
+    m = VariantMatcher(var)
+    sections = {
+        "var": marshal.dumps(var),
+        "read": marshal.dumps(read),
+        "matcher": marshal.dumps([MATCHER_FORMAT, m.ordered, m.table,
+                                  m.pattern.pattern if m.pattern is not None else None]),
+    }
+    header = {
+        "format": 1,
+        "maps_version": _stamp(var, read),
+        "normalizer_version": NORMALIZER_VERSION,
+        "sources": {k: _source_info(n) for k, n in _SOURCES.items()},
+        "sections": {},
+    }
+    # offsets depend on the header length, which depends on the offsets: settle it
+    hlen = 0
+    while True:
+        off = len(_MAGIC) + 4 + hlen
+        for k, blob in sections.items():
+            header["sections"][k] = [off, len(blob)]
+            off += len(blob)
+        raw = json.dumps(header, sort_keys=True).encode("utf-8")
+        if len(raw) == hlen:
+            break
+        hlen = len(raw)
+    tmp = str(path) + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + struct.pack("<I", hlen) + raw + b"".join(sections.values()))
+    os.replace(tmp, path)
+    _SNAPSHOT = _NOT_LOADED
+    return header
+
+# ---- compiled variant matcher ----
+# The variant map is compiled once per map version into a trie-shaped regex
+# (one alternation per trie node, single-char leaves folded into a class), so
+# canon_hanja does one leftmost-longest scan in C instead of one full
+# str.replace pass per key.
+
+def _replace_sequential(text: str, var: dict) -> str:
+    """Reference behaviour: longest keys first, one replace pass per key."""
+    for k in sorted(var.keys(), key=len, reverse=True):
+        text = text.replace(k, var[k])
+    return text
+
+def _resolve_targets(keys, var: dict):
+    # Sequential replacement lets a later key rewrite the output of an earlier
+    # one (A->B, B->C).  Pre-apply that chain to every target so one pass gives
+    # the same text.  Identity entries are dropped: they never change the text
+    # and would otherwise shadow shorter keys.  Later keys occurring in a target
+    # are found by walking the key trie over the (short) target, so this is
+    # linear in the number of keys.
+    table, produced = {}, set()
+    trie = key_trie(keys)
+    for i, k in enumerate(keys):
+        v = var[k]
+        produced.add(v)
+        j = next_key_in(v, trie, i)
+        while j is not None:
+            v = v.replace(keys[j], var[keys[j]])
+            produced.add(v)
+            j = next_key_in(v, trie, j)
+        if v != k:
+            table[k] = v
+    return table, produced
+
+def _phrases_overlap(phrases, produced) -> bool:
+    # A single scan matches phrases against the original text; the per-key
+    # replace matches them against text already rewritten by longer keys.  The
+    # two only differ when a phrase can straddle another phrase or a produced
+    # target, so detect that (conservatively) and fall back for phrases.
+    prefixes = {k[:i] for k in phrases for i in range(1, len(k))}
+    suffixes = {k[i:] for k in phrases for i in range(1, len(k))}
+    for s in list(phrases) + list(produced):
+        for i in range(1, len(s)):
+            if s[i:] in prefixes or s[:i] in suffixes:
+                return True
+    inner = {k[i:j] for k in phrases for i in range(len(k)) for j in range(i + 1, len(k) + 1)}
+    return any(v in inner and v not in phrases for v in produced)
+
+# Below this many effective keys a few str.replace passes (memchr-fast) beat
+# the regex scan plus per-match callback; above it the scan wins and keeps
+# winning as the map grows (see scripts/bench_canon_hanja.py).
+_SCAN_MIN_KEYS = 128
+
+# bump when the compiled form below (ordered / table / pattern, incl. trie.trie_pattern) changes meaning
+MATCHER_FORMAT = 1
+
+class VariantMatcher:
+    """Longest-match variant replacer compiled from a variant map."""
+
+    @classmethod
+    def from_compiled(cls, ordered, table, pattern):
+        m = cls.__new__(cls)
+        m.ordered = [tuple(kv) for kv in ordered]
+        m.table = table
+        m.pattern = re.compile(pattern) if pattern is not None else None
+        return m
+
+    def __init__(self, var: dict):
+        keys = sorted(var.keys(), key=len, reverse=True)
+        phrases = [k for k in keys if len(k) > 1]
+        self.ordered = []  # (key, value) pairs applied by per-key replace
+        if sum(var[k] != k for k in keys) < _SCAN_MIN_KEYS:
+            self.ordered = [(k, var[k]) for k in keys if var[k] != k]
+            keys = []
+        elif phrases:
+            # only phrase outputs can feed a phrase match: single-char keys are
+            # replaced after every phrase in the sequential order
+            _, produced = _resolve_targets(phrases, var)
+            if _phrases_overlap(phrases, produced):
+                self.ordered = [(k, var[k]) for k in phrases if var[k] != k]
+                keys = [k for k in keys if len(k) == 1]
+        self.table, _ = _resolve_targets(keys, var)
+        self.pattern = re.compile(trie_pattern(self.table)) if self.table else None
+
+    def sub(self, text: str) -> str:
+        if not text:
+            return text
+        for k, v in self.ordered:
+            text = text.replace(k, v)
+        if self.pattern is None:
+            return text
+        table = self.table
+        return self.pattern.sub(lambda m: table[m.group()], text)
+
+_MATCHER = None  # (version, VariantMatcher, the VAR it was built from)
+_GENERATION = 0
+
+def maps_changed():
+    """Call after editing VAR in place without adding or removing keys (e.g. a changed target)."""
+    global _GENERATION
+    _GENERATION += 1
+
+def _map_version(var: dict):
+    # O(1) per call: together with the identity check in variant_matcher, a
+    # rebound VAR, an added/removed key or maps_changed() forces a rebuild
+    return (len(var), _GENERATION)
+
+def _snapshot_matcher():
+    snap = _snapshot()
+    if snap is None:
+        return None
+    fmt, ordered, table, pattern = snap.section("matcher")
+    return VariantMatcher.from_compiled(ordered, table, pattern) if fmt == MATCHER_FORMAT else None
+
+def variant_matcher(var: dict = None) -> VariantMatcher:
+    """Return the compiled matcher for ``var`` (default: VAR), rebuilt only when the map changes."""
+    global _MATCHER
+    cur = globals().get("VAR")
+    if var is not None and var is not cur:
+        return VariantMatcher(var)
+    if cur is None:
+        # VAR never touched: the snapshot's matcher is exactly VariantMatcher(VAR)
+        if _MATCHER is None:
+            m = _snapshot_matcher()
+            _MATCHER = ("snapshot", m, None) if m is not None else (None, None, None)
+        if _MATCHER[1] is not None:
+            return _MATCHER[1]
+        cur = _maps("VAR")
+    ver = _map_version(cur)
+    if _MATCHER is None or _MATCHER[0] != ver or _MATCHER[2] is not cur:
+        _MATCHER = (ver, VariantMatcher(cur), cur)
+    return _MATCHER[1]
 
 def canon_hanja(text: str) -> str:
     if not text: return text
     t = unicodedata.normalize("NFKC", text)
-    # greedy phrase replace first (longest keys first), then char replace
-    keys = sorted(VAR.keys(), key=len, reverse=True)
-    for k in keys:
-        t = t.replace(k, VAR[k])
-    return t
+    # greedy phrase replace (longest key wins), one scan over the text
+    return variant_matcher().sub(t)
 
 def annotate_readings(text: str) -> str:
     if not text: return text
+    read = _maps("READ")
     def repl(ch):
-        if ch in READ:
-            rd = READ[ch][0]
+        if ch in read:
+            rd = read[ch][0]
             return f"{ch}[{rd}]"
         return ch
     return "".join(repl(c) for c in text)
@@ -44,3 +310,44 @@ def normalize_for_index(text: str) -> str:
     # annotate selected hanja with readings for better search recall
     t = annotate_readings(t)
     return t
+
+# ---- streaming ----
+# normalize_for_index is applied piecewise.  Pieces are cut just before a
+# whitespace run (preferably the one holding the last newline): NFKC never
+# composes across a whitespace starter, the whitespace regexes only ever match
+# inside one run, and variant keys are whitespace-free, so joining the pieces
+# gives exactly normalize_for_index(whole_text).
+
+def _safe_cut(buf: str, hard: bool) -> int:
+    i = buf.rfind("\n")
+    if i < 0:
+        if not hard:
+            return 0
+        # no newline for a long stretch: fall back to any whitespace run
+        i = len(buf) - 1
+        while i >= 0 and not buf[i].isspace():
+            i -= 1
+        if i < 0:
+            return 0
+    while i > 0 and buf[i - 1].isspace():
+        i -= 1
+    return i
+
+def normalize_stream(chunks: Iterable[str], max_buffer: int = 4 << 20) -> Iterator[str]:
+    """
+    Yield normalized pieces of the concatenated ``chunks``.
+
+    Memory is bounded by one chunk plus the carried tail; the tail only grows
+    past ``max_buffer`` characters on text without any whitespace.
+    """
+    buf = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf = buf + chunk if buf else chunk
+        cut = _safe_cut(buf, hard=len(buf) > max_buffer)
+        if cut:
+            yield normalize_for_index(buf[:cut])
+            buf = buf[cut:]
+    if buf:
+        yield normalize_for_index(buf)
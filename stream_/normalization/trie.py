@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Character tries over a set of keys:
+- trie_pattern: one regex matching any key, longest first at each position
+  (hanja_norm's variant matcher, condition_filter's keyword matcher)
+- key_trie / next_key_in: find which keys occur in a string without one
+  ``in`` test per key
+"""
+import re
+
+def trie_pattern(keys) -> str:
+    """Regex source matching any of ``keys``, longest first at each position."""
+    trie = {}
+    for k in keys:
+        node = trie
+        for ch in k:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        leaves = sorted(ch for ch, sub in node.items() if ch and list(sub) == [""])
+        alts = [re.escape(ch) + build(sub)
+                for ch, sub in sorted(node.items()) if ch and list(sub) != [""]]
+        if len(leaves) == 1:
+            alts.append(re.escape(leaves[0]))
+        elif leaves:
+            alts.append("[" + "".join(re.escape(ch) for ch in leaves) + "]")
+        if not alts:
+            return ""
+        if "" in node:
+            # greedy optional: try the longer key before stopping here
+            return "(?:" + "|".join(alts) + ")?"
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+def key_trie(keys) -> dict:
+    """Character trie over ``keys``; a key's last node maps None to its index."""
+    trie = {}
+    for idx, k in enumerate(keys):
+        node = trie
+        for ch in k:
+            node = node.setdefault(ch, {})
+        node[None] = idx
+    return trie
+
+def next_key_in(text: str, trie: dict, after: int):
+    """Smallest key index > ``after`` among the keys occurring in ``text``."""
+    best = None
+    for start in range(len(text)):
+        node = trie
+        for ch in text[start:]:
+            node = node.get(ch)
+            if node is None:
+                break
+            idx = node.get(None)
+            if idx is not None and idx > after and (best is None or idx < best):
+                best = idx
+    return best
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled if/then rule engine over saju chart features.
+
+Rule conditions ("재성이 강하고 관성이 약하면", "정인이 일지와 충", ...) are
+parsed into predicates over chart features, in disjunctive normal form:
+a rule fires when every literal of one of its clauses holds.  Predicates are
+feature keys in the same call-like form saju_features already uses:
+
+  strong("재성")  weak("재성")  has("재성")  has_gan("재성")  rooted("정인")
+  gongmang("정인")  ipmyo("정인")  at("정인","연간")  일간=갑목
+  hap("관성","재성")  chung("일지","편인")  ... (합 충 형 파 해 연결; sorted pair)
+  saeng("식신","재성")  geuk("관성","비겁")  (생/극 keep their direction)
+  hap()  chung()  ...  ("합이 되면": some such relation; feature_set adds it)
+
+"X을 보면" / "X를 만나면" read as has("X").  Rules whose condition is not
+understood are kept (``unparsed``) but never fire; each is logged once.
+
+Identical clauses are shared between rules and indexed by their positive
+literals, so evaluating a chart only counts hits on clauses that contain one
+of the chart's features (plus the few clauses made only of negations).
+
+evaluate_batch() scores many charts at once with NumPy: charts become a
+boolean feature matrix, clauses become padded column-index masks, and the
+N x M fire matrix comes out of gathers and reductions instead of a Python
+loop per chart.
+"""
+import logging, re, unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Literal = Tuple[str, bool]  # (feature key, must be present)
+
+log = logging.getLogger(__name__)
+
+NO_MATCH = "조건 불충족"
+
+_NAME = r"[가-힣A-Za-z0-9一-鿿]+?"
+_SUBJ = r"(?:이|가|은|는|도)"
+_WITH = r"(?:와|과|랑|이랑|을|를|에게|의)"
+_POSITIONS = "연간|년간|연지|년지|월간|월지|일간|일지|시간|시지|지장간|천간|지지"
+_REL = {"합": "hap", "충": "chung", "형": "hyeong", "파": "pa", "해": "hae",
+        "연결": "link", "생": "saeng", "극": "geuk"}
+_DIRECTED = {"saeng", "geuk"}
+_REL_RE = "|".join(sorted(_REL, key=len, reverse=True))
+# subjects whose "X이 Y" means an attribute value rather than a predicate
+ATTRIBUTES = {"일간", "일주", "월령", "격국", "용신", "희신", "기신", "성별", "대운", "세운"}
+
+# (pattern searched in the predicate text, feature name), first match wins
+_STATES = [
+    (r"투출|투간|천간에", "has_gan"),
+    (r"통근|뿌리", "rooted"),
+    (r"공망", "gongmang"),
+    (r"입묘|묘에", "ipmyo"),
+    (r"태과|강|왕|많|旺", "strong"),
+    (r"태약|약|쇠|적|부족", "weak"),
+    (r"있|존재|보이|^보$|나타|출현", "has"),  # "보이면" reaches here as "보"
+]
+
+_OR = re.compile(r"(?:하|이)?거나\s+|\s+(?:또는|혹은)\s+")
+_AND = re.compile(r"(?<=[가-힣])(?:하고|이고|고|하며|이며|며)\s+|\s*,\s*|\s+그리고\s+")
+_TAIL = re.compile(r"\s*(?:(?:하|이)?면|(?:할|일|한|하는)?\s*(?:경우|때)(?:에는|에|엔)?)\s*$")
+_NEG = re.compile(r"지\s*(?:않|못)|못\s*하|아니")
+_PAIR = re.compile(rf"^(?P<a>{_NAME})(?:와|과|랑|이랑)\s*(?P<b>{_NAME}){_SUBJ}?\s*(?:서로\s*)?(?P<rel>{_REL_RE})")
+_SUBJECT = re.compile(rf"^(?P<x>{_NAME}){_SUBJ}\s*(?P<rest>.*)$")
+_OBJECT = re.compile(rf"^(?P<y>{_NAME}){_WITH}\s*(?:서로\s*)?(?P<rel>{_REL_RE})")
+_SEES = re.compile(rf"^(?P<x>{_NAME})(?:을|를)\s*(?:보|만나|만날|얻|가지|갖|두)")
+_BARE_REL = re.compile(rf"^(?P<rel>{_REL_RE})(?:이|가)?\s*(?:되|이루|성립|있|생기|하|$)")
+_REL_KEY = re.compile(rf"^({'|'.join(_REL.values())})\(\"")
+_AT = re.compile(rf"^(?P<pos>{_POSITIONS})(?:에서|에|의)?\s*(?:있|존재|위치|자리|앉|놓|뜨|투출)")
+
+def relation_key(rel: str, a: str, b: str) -> str:
+    if rel not in _DIRECTED:
+        a, b = sorted((a, b))
+    return f'{rel}("{a}","{b}")'
+
+def _predicate(x: str, rest: str) -> Optional[Literal]:
+    neg = bool(_NEG.search(rest))
+    m = _OBJECT.match(rest)
+    if m:
+        return relation_key(_REL[m["rel"]], x, m["y"]), not neg
+    m = _AT.match(rest)
+    if m:
+        return f'at("{x}","{m["pos"]}")', not neg
+    if re.search(r"없", rest):
+        return f'has("{x}")', neg
+    for pat, name in _STATES:
+        if re.search(pat, rest):
+            return f'{name}("{x}")', not neg
+    if x in ATTRIBUTES:
+        value = re.sub(r"(?:이|일|인)$", "", rest.strip())
+        if value and " " not in value:
+            return f"{x}={value}", not neg
+    return None
+
+def _part(part: str, subject: Optional[str]) -> Tuple[Optional[Literal], Optional[str]]:
+    m = _PAIR.match(part)
+    if m:
+        return (relation_key(_REL[m["rel"]], m["a"], m["b"]), not _NEG.search(part)), subject
+    m = _SEES.match(part)
+    if m:
+        return (f'has("{m["x"]}")', not _NEG.search(part)), m["x"]
+    m = _BARE_REL.match(part)
+    if m:
+        return (f'{_REL[m["rel"]]}()', not _NEG.search(part)), subject
+    m = _SUBJECT.match(part)
+    if m and m["rest"]:
+        lit = _predicate(m["x"], m["rest"])
+        if lit is not None:
+            return lit, m["x"]
+    if subject:
+        # "정인이 연간에 존재하고 통근됨": the subject carries over
+        return _predicate(subject, part), subject
+    return None, subject
+
+def parse_condition(text: str) -> Optional[List[List[Literal]]]:
+    """Condition text -> DNF clauses of literals, or None if any part is not understood."""
+    text = unicodedata.normalize("NFKC", text or "").strip().rstrip(".,!? ")
+    text = _TAIL.sub("", text)
+    if not text:
+        return None
+    clauses = []
+    for alt in _OR.split(text):
+        clause, subject = [], None
+        for part in _AND.split(alt):
+            part = _TAIL.sub("", part.strip())
+            if not part:
+                continue
+            lit, subject = _part(part, subject)
+            if lit is None:
+                return None
+            clause.append(lit)
+        if not clause:
+            return None
+        clauses.append(clause)
+    return clauses
+
+def feature_set(saju_features) -> set:
+    """
+    Chart features as a set of keys.  Dict values: True -> key, False/None ->
+    nothing, str/number -> "key=value", list/set/tuple -> "key=item" each.
+    Any relation key (hap("a","b")) also adds its bare form (hap()).
+    """
+    out = set() if isinstance(saju_features, dict) else set(saju_features)
+    if not isinstance(saju_features, dict):
+        saju_features = {}
+    for k, v in saju_features.items():
+        if v is True:
+            out.add(k)
+        elif v is False or v is None:
+            continue
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            out.update(f"{k}={x}" for x in v)
+        else:
+            out.add(f"{k}={v}")
+    for k in list(out):
+        m = _REL_KEY.match(k)
+        if m:
+            out.add(f"{m[1]}()")
+    return out
+
+def _numpy():
+    try:
+        import numpy as np
+    except Exception as e:
+        raise RuntimeError("numpy 미설치: pip install numpy") from e
+    return np
+
+def _condition(rule: dict) -> str:
+    return rule.get("condition", rule.get("if", ""))
+
+def _result(rule: dict) -> str:
+    return rule.get("result", rule.get("then", ""))
+
+class RuleEngine:
+    """
+    Rules are dicts with "condition"/"result" (or extractor "if"/"then");
+    other fields (id, source, source_sent, ...) are passed through as provenance.
+    """
+
+    def __init__(self, rules: Iterable[dict] = ()):
+        self.rules: List[dict] = []
+        self.unparsed: List[int] = []        # rule indices whose condition was not understood
+        self._clause_ids: Dict[tuple, int] = {}
+        self._clauses: List[Tuple[frozenset, frozenset]] = []  # (positive keys, negated keys)
+        self._clause_rules: List[List[int]] = []
+        self._by_feature: Dict[str, List[int]] = defaultdict(list)
+        self._neg_only: List[int] = []
+        self._arrays = None  # batch-mode masks, rebuilt after add()
+        for r in rules:
+            self.add(r)
+
+    def add(self, rule: dict) -> int:
+        idx = len(self.rules)
+        self.rules.append(rule)
+        self._arrays = None
+        clauses = parse_condition(_condition(rule))
+        if clauses is None:
+            self.unparsed.append(idx)
+            log.warning("rule %d (id=%s) not understood, it will never fire: %r",
+                        idx, rule.get("id"), _condition(rule))
+            return idx
+        for clause in clauses:
+            pos = frozenset(k for k, p in clause if p)
+            neg = frozenset(k for k, p in clause if not p)
+            if pos & neg:
+                continue  # can never hold
+            cid = self._clause_ids.get((pos, neg))
+            if cid is None:
+                cid = len(self._clauses)
+                self._clause_ids[(pos, neg)] = cid
+                self._clauses.append((pos, neg))
+                self._clause_rules.append([])
+                for k in pos:
+                    self._by_feature[k].append(cid)
+                if not pos:
+                    self._neg_only.append(cid)
+            if idx not in self._clause_rules[cid]:
+                self._clause_rules[cid].append(idx)
+        return idx
+
+    @property
+    def predicates(self) -> List[str]:
+        return sorted(self._by_feature)
+
+    def fired_clauses(self, features: set) -> List[int]:
+        hits: Dict[int, int] = defaultdict(int)
+        for f in features:
+            for cid in self._by_feature.get(f, ()):
+                hits[cid] += 1
+        clauses = self._clauses
+        out = [cid for cid, n in hits.items()
+               if n == len(clauses[cid][0]) and not (clauses[cid][1] & features)]
+        out += [cid for cid in self._neg_only if not (clauses[cid][1] & features)]
+        return out
+
+    def evaluate(self, saju_features) -> List[dict]:
+        """Every rule that fires on this chart, in rule order, with the clause that fired it."""
+        fs = feature_set(saju_features)
+        matched: Dict[int, int] = {}
+        for cid in self.fired_clauses(fs):
+            for idx in self._clause_rules[cid]:
+                if idx not in matched or cid < matched[idx]:
+                    matched[idx] = cid
+        out = []
+        for idx in sorted(matched):
+            rule = self.rules[idx]
+            pos, neg = self._clauses[matched[idx]]
+            out.append({
+                "rule_index": idx,
+                "id": rule.get("id"),
+                "condition": _condition(rule),
+                "result": _result(rule),
+                "matched": sorted(pos) + sorted(f"not {k}" for k in neg),
+                "source": rule.get("source"),
+                "source_sent": rule.get("source_sent"),
+            })
+        return out
+
+    # ---- batch mode (NumPy) ----
+    # feature matrix columns: 0 is always True, 1 is always False, then one per predicate
+    def _compile(self):
+        np = _numpy()
+        vocab: Dict[str, int] = {}
+        col = lambda k: vocab.setdefault(k, len(vocab) + 2)
+        n_clauses = len(self._clauses)
+        width_pos = max([len(p) for p, _ in self._clauses] + [1])
+        width_neg = max([len(n) for _, n in self._clauses] + [1])
+        pos = np.zeros((n_clauses, width_pos), np.intp)  # padding -> always True
+        neg = np.ones((n_clauses, width_neg), np.intp)   # padding -> always False
+        for cid, (p, n) in enumerate(self._clauses):
+            pos[cid, :len(p)] = [col(k) for k in sorted(p)]
+            neg[cid, :len(n)] = [col(k) for k in sorted(n)]
+        # (rule, clause) pairs grouped by rule so logical_or.reduceat gives one column per rule
+        pairs = sorted((idx, cid) for cid, rs in enumerate(self._clause_rules) for idx in rs)
+        pair_rule = np.array([r for r, _ in pairs], np.intp)
+        pair_clause = np.array([c for _, c in pairs], np.intp)
+        starts = np.flatnonzero(np.r_[True, pair_rule[1:] != pair_rule[:-1]]) if pairs else pair_rule
+        self._arrays = (vocab, pos, neg, pair_clause, pair_rule[starts], starts)
+        return self._arrays
+
+    def encode(self, charts: Iterable) -> "np.ndarray":
+        """Charts -> boolean feature matrix (predicates no rule uses are dropped)."""
+        np = _numpy()
+        vocab = (self._arrays or self._compile())[0]
+        charts = list(charts)
+        x = np.zeros((len(charts), len(vocab) + 2), bool)
+        x[:, 0] = True
+        for i, chart in enumerate(charts):
+            cols = [vocab[f] for f in feature_set(chart) if f in vocab]
+            x[i, cols] = True
+        return x
+
+    def evaluate_batch(self, charts: Iterable, max_cells: int = 1 << 26) -> "np.ndarray":
+        """
+        N x len(rules) boolean matrix; [i, j] is True when rule j fires on chart i.
+        Charts are processed in slices so the intermediate gathers stay under
+        about ``max_cells`` booleans.
+        """
+        np = _numpy()
+        vocab, pos, neg, pair_clause, rule_ids, starts = self._arrays or self._compile()
+        x = charts if isinstance(charts, np.ndarray) else self.encode(charts)
+        out = np.zeros((len(x), len(self.rules)), bool)
+        if not len(pair_clause) or not len(x):
+            return out
+        step = max(1, max_cells // (len(pos) * (pos.shape[1] + neg.shape[1])))
+        for s in range(0, len(x), step):
+            xs = x[s:s + step]
+            fired = xs[:, pos].all(axis=2) & ~xs[:, neg].any(axis=2)
+            out[s:s + step, rule_ids] = np.logical_or.reduceat(fired[:, pair_clause], starts, axis=1)
+        return out
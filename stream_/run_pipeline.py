@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
-import os, json, argparse
-from typing import Iterable, List
-from .parser import load_text_any, yield_sentences
-from .condition_filter import filter_stream
+import os, glob, json, hashlib, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from typing import Iterable, Iterator, List
+from .file_parser import iter_file, iter_sentences
+from .doc_cache import iter_file_cached
+from .condition_filter import filter_matches
 from .gpt_extractor_v2 import extract_rule_advanced
+from .async_extractor import AsyncRuleExtractor
+from .checkpoint import CheckpointIndex
+from .sinks import iter_jsonl, open_sink, sink_class
+from .dedupe import DedupeSink, NearDupIndex
 
-def batched(iterable: Iterable[str], n: int) -> Iterable[List[str]]:
+def batched(iterable: Iterable, n: int) -> Iterable[List]:
     batch = []
     for item in iterable:
         batch.append(item)
@@ -14,74 +21,252 @@ def batched(iterable: Iterable[str], n: int) -> Iterable[List[str]]:
             batch = []
     if batch: yield batch
 
+def duplicates_path(output_path: str) -> str:
+    root, ext = os.path.splitext(output_path)
+    if ext.lower() == ".gz":
+        root = os.path.splitext(root)[0]
+    return root + ".duplicates.jsonl"
+
+def _open_output(output_path: str, dedupe: float = None):
+    """Sink for output_path; with ``dedupe`` (a similarity threshold) near-duplicates go to the links file."""
+    sink = open_sink(output_path)
+    if dedupe:
+        sink = DedupeSink(sink, open_sink(duplicates_path(output_path)), NearDupIndex(threshold=dedupe))
+    return sink
+
+def _resume_output(output_path: str, ck: CheckpointIndex, dedupe: float = None):
+    """
+    Sink for a run that continues ``ck``, or None when the output has to be
+    rebuilt from the checkpoint at the end: non-appendable formats, a
+    checkpoint without a recorded output size, and dedupe (its index lives in memory).
+    """
+    if not ck.records:
+        return _open_output(output_path, dedupe)
+    if (dedupe or ck.out_bytes is None or not sink_class(output_path).appendable
+            or not os.path.exists(output_path) or os.path.getsize(output_path) < ck.out_bytes):
+        return None
+    sink = open_sink(output_path, append_at=ck.out_bytes)
+    sink.count = ck.records
+    return sink
+
+def _out_bytes(sink):
+    return sink.size() if getattr(sink, "appendable", False) else None
+
+def _extract(items, source, extractor=None) -> Iterator:
+    """Extraction results for (sentence, matches) items, in order; an Exception marks a failure."""
+    if extractor is not None:
+        return iter(extractor.extract([s for s, _ in items], source=source))
+    def one(s, matches):
+        try:
+            return extract_rule_advanced(s, source=source, matches=matches)
+        except Exception as e:
+            return e
+    return (one(s, m) for s, m in items)
+
 def run_pipeline(
     input_path="input/Book1.docx",
     output_path="output/rules_output.json",
     batch_size:int=10,
     max_records:int=None,
     checkpoint_path="intermediate/checkpoint.jsonl",
-    resume:bool=True
+    resume:bool=True,
+    use_cache:bool=True,
+    extractor=None,
+    dedupe:float=None
 ):
+    """
+    ``extractor``: e.g. AsyncRuleExtractor; each batch goes out as concurrent LLM requests.
+    With an extractor a batch is at least sentences_per_request × concurrency
+    sentences, so every concurrent request slot has work.
+    ``dedupe``: similarity threshold (e.g. 0.8); near-duplicate rules are left out of
+    the output and listed in <output>.duplicates.jsonl with their canonical id.
+    """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
 
-    text = load_text_any(input_path)
-    sent_stream = filter_stream(yield_sentences(text))
+    chunks = iter_file_cached(input_path) if use_cache else iter_file(input_path)
+    sent_stream = filter_matches(iter_sentences(chunks))
 
-    processed = 0
-    results = []
-    seen = set()
+    ck = CheckpointIndex(checkpoint_path)
+    ck.load() if resume else ck.reset()
+    processed = ck.records
+    # output is written as batches complete; a resumed run appends to it, or
+    # (formats that cannot be appended to) rebuilds it from the checkpoint at the end
+    sink = _resume_output(output_path, ck, dedupe)
+    # sentences before the offset marker are fully handled; skip them without lookups
+    consumed = ck.consumed
+    done_upto = consumed  # stays at the first failure so it is retried on resume
+    failed = False
 
-    if resume and os.path.exists(checkpoint_path):
-        with open(checkpoint_path, "r", encoding="utf-8") as ck:
-            for line in ck:
-                try:
-                    rec = json.loads(line)
-                    results.append(rec)
-                    seen.add(rec.get("source_sent", ""))
-                except Exception:
-                    pass
-        processed = len(results)
-
-    for batch in batched(sent_stream, batch_size):
+    if extractor is not None:
+        batch_size = max(batch_size, extractor.sentences_per_request * extractor.concurrency)
+
+    for batch in batched(islice(sent_stream, consumed, None), batch_size):
+        items = []  # (stream position, sentence, matches, needs extraction)
+        fresh = 0
+        for s, matches in batch:
+            if max_records is not None and processed + fresh >= max_records: break
+            consumed += 1
+            todo = s not in ck
+            fresh += todo
+            items.append((consumed, s, matches, todo))
+        results = _extract([(s, m) for _, s, m, todo in items if todo], input_path, extractor)
         out_batch = []
-        for s in batch:
-            if max_records is not None and processed >= max_records: break
-            if s in seen: continue
+        for pos, s, matches, todo in items:
+            if todo:
+                try:
+                    extracted = next(results)
+                    if isinstance(extracted, Exception):
+                        raise extracted
+                    obj = json.loads(extracted)
+                    obj["id"] = processed + 1
+                    obj["source_sent"] = s
+                    out_batch.append(obj)
+                    processed += 1
+                except Exception as e:
+                    failed = True
+                    print(f"[ERROR] {processed+1}: {e}")
+            if not failed: done_upto = pos
+        if sink is not None:
+            sink.write(out_batch)
+        ck.commit(out_batch, done_upto, out_bytes=_out_bytes(sink))
+        if max_records is not None and processed >= max_records: break
+    ck.close()
+    if sink is None:
+        sink = _open_output(output_path, dedupe)
+        sink.write(ck.iter_records())
+        sink.close()
+        ck.commit([], ck.consumed, out_bytes=_out_bytes(sink))
+    else:
+        sink.close()
+    dups = f" (유사 중복 {sink.duplicates}개 제외)" if dedupe else ""
+    print(f"✅ {sink.count}개 규칙 저장 완료{dups} → {output_path}")
+    return output_path
+
+# ---- corpus mode ----
+CORPUS_EXTS = (".txt", ".docx", ".pdf")
+
+def is_corpus_input(input_path: str) -> bool:
+    return os.path.isdir(input_path) or glob.has_magic(input_path)
+
+def list_corpus(input_path: str) -> List[str]:
+    """Files under a directory (recursive) or matching a glob, sorted by path."""
+    if os.path.isdir(input_path):
+        paths = glob.glob(os.path.join(input_path, "**", "*"), recursive=True)
+    else:
+        paths = glob.glob(input_path, recursive=True)
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(CORPUS_EXTS))
+
+def _file_tag(path: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+def run_corpus(
+    input_path="input",
+    output_path="output/rules_output.json",
+    workers:int=None,
+    work_dir="intermediate/corpus",
+    dedupe:float=None,
+    **kwargs
+):
+    """
+    run_pipeline over every file of a directory/glob on a process pool.
+
+    Each file gets its own checkpoint and partial output under ``work_dir``
+    (so reruns resume per file); the merged output lists files in path order
+    and records in their per-file order, with ids renumbered from 1.  With
+    ``dedupe`` near-duplicates are grouped across files at merge time.
+    """
+    files = list_corpus(input_path)
+    if not files:
+        raise ValueError(f"입력 파일 없음: {input_path}")
+    os.makedirs(work_dir, exist_ok=True)
+    parts = {
+        f: (os.path.join(work_dir, _file_tag(f) + ".jsonl"),
+            os.path.join(work_dir, _file_tag(f) + ".checkpoint.jsonl"))
+        for f in files
+    }
+    # largest files first so the long tail does not leave cores idle
+    order = sorted(files, key=lambda f: (-os.path.getsize(f), f))
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = {
+            ex.submit(run_pipeline, input_path=f, output_path=parts[f][0],
+                      checkpoint_path=parts[f][1], **kwargs): f
+            for f in order
+        }
+        for fut in as_completed(futs):
             try:
-                extracted = extract_rule_advanced(s, source=input_path)
-                obj = json.loads(extracted)
-                obj["id"] = processed + 1
-                obj["source_sent"] = s
-                out_batch.append(obj)
-                processed += 1
+                fut.result()
             except Exception as e:
-                print(f"[ERROR] {processed+1}: {e}")
-        if out_batch:
-            with open(checkpoint_path, "a", encoding="utf-8") as ck:
-                for r in out_batch:
-                    ck.write(json.dumps(r, ensure_ascii=False) + "\n")
-            results.extend(out_batch)
-        if max_records is not None and processed >= max_records: break
+                failed.append(futs[fut])
+                print(f"[ERROR] {futs[fut]}: {e}")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"✅ {len(results)}개 규칙 저장 완료 → {output_path}")
+    next_id = 1  # not sink.count: dropped near-duplicates still take an id
+    with _open_output(output_path, dedupe) as sink:
+        for f in files:
+            if f in failed:
+                continue
+            for batch in batched(iter_jsonl(parts[f][0]), 1000):
+                for i, rec in enumerate(batch, next_id):
+                    rec["file_id"] = rec.get("id")
+                    rec["id"] = i
+                next_id += len(batch)
+                sink.write(batch)
+    dups = f" (유사 중복 {sink.duplicates}개 제외)" if dedupe else ""
+    print(f"✅ {len(files) - len(failed)}/{len(files)}개 파일, {sink.count}개 규칙 병합{dups} → {output_path}")
+    return output_path
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
-    ap.add_argument("--input", default="input/Book1.docx")
-    ap.add_argument("--output", default="output/rules_output.json")
-    ap.add_argument("--batch-size", type=int, default=10)
+    ap.add_argument("--input", default="input/Book1.docx", help="file, directory or glob (corpus mode)")
+    ap.add_argument("--output", default="output/rules_output.json",
+                    help="sink by extension: .json, .jsonl/.ndjson(.gz), .parquet, .arrow")
+    ap.add_argument("--batch-size", type=int, default=10,
+                    help="sentences per checkpoint commit (with --llm: at least per-request × concurrency)")
     ap.add_argument("--max-records", type=int, default=None)
     ap.add_argument("--checkpoint", default="intermediate/checkpoint.jsonl")
     ap.add_argument("--no-resume", action="store_true")
+    ap.add_argument("--no-cache", action="store_true", help="parse the input again even if cached")
+    ap.add_argument("--workers", type=int, default=None, help="corpus mode: worker processes (default: CPUs)")
+    ap.add_argument("--work-dir", default="intermediate/corpus", help="corpus mode: per-file checkpoints/outputs")
+    ap.add_argument("--llm", action="store_true", help="extract with the async batched LLM client")
+    ap.add_argument("--llm-base-url", default=None, help="e.g. http://127.0.0.1:8765/v1 (scripts/stub_llm_server.py)")
+    ap.add_argument("--llm-per-request", type=int, default=8, help="sentences packed into one request")
+    ap.add_argument("--llm-concurrency", type=int, default=16)
+    ap.add_argument("--llm-rps", type=float, default=5.0, help="requests per second")
+    ap.add_argument("--dedupe", type=float, nargs="?", const=0.8, default=None, metavar="THRESHOLD",
+                    help="drop near-duplicate rules (MinHash/LSH, default 0.8); links go to <output>.duplicates.jsonl")
     args = ap.parse_args()
-    run_pipeline(
-        input_path=args.input,
-        output_path=args.output,
+    extractor = None
+    if args.llm or args.llm_base_url:
+        extractor = AsyncRuleExtractor(
+            base_url=args.llm_base_url,
+            sentences_per_request=args.llm_per_request,
+            concurrency=args.llm_concurrency,
+            requests_per_sec=args.llm_rps
+        )
+    common = dict(
         batch_size=args.batch_size,
         max_records=args.max_records,
-        checkpoint_path=args.checkpoint,
-        resume=not args.no_resume
+        resume=not args.no_resume,
+        use_cache=not args.no_cache,
+        extractor=extractor,
+        dedupe=args.dedupe
     )
+    if is_corpus_input(args.input):
+        run_corpus(
+            input_path=args.input,
+            output_path=args.output,
+            workers=args.workers,
+            work_dir=args.work_dir,
+            **common
+        )
+    else:
+        run_pipeline(
+            input_path=args.input,
+            output_path=args.output,
+            checkpoint_path=args.checkpoint,
+            **common
+        )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+structured_terms load benchmark: per-row INSERT vs execute_values vs COPY.
+
+  DATABASE_URL=postgresql://... python scripts/bench_bulk_load.py --rows 10000
+
+Rows are tagged with a unique source_file and deleted afterwards.
+"""
+import argparse, sys, time, uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from db import TERM_COLUMNS, bulk_insert_terms, get_conn, init_db, term_rows  # noqa: E402
+
+def synthetic_terms(n: int):
+    return [{
+        "category": "십신", "term": f"용어{i}", "definition": f"정의 {i}\t탭\n줄바꿈",
+        "explanation": "설명 \\ 역슬래시", "examples": [f"사례{i}"],
+        "rules": [{"if": "재성 강", "then": "관 약"}], "keywords": ["재성", "관성"],
+    } for i in range(n)]
+
+def row_by_row(conn, data, source_file):
+    t0 = time.perf_counter()
+    sql = f"INSERT INTO structured_terms ({', '.join(TERM_COLUMNS)}) VALUES ({', '.join(['%s'] * len(TERM_COLUMNS))})"
+    with conn.cursor() as cur:
+        for r in term_rows(data, source_file):
+            cur.execute(sql, r)
+    conn.commit()
+    sec = time.perf_counter() - t0
+    return {"rows": len(data), "seconds": sec, "rows_per_sec": len(data) / sec}
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark structured_terms loading")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--batch-size", type=int, default=5000)
+    ap.add_argument("--skip-rowwise", action="store_true", help="skip the slow per-row baseline")
+    args = ap.parse_args()
+
+    init_db()
+    data = synthetic_terms(args.rows)
+    tag = f"bench-{uuid.uuid4().hex[:8]}"
+    with get_conn() as conn:
+        try:
+            runs = [] if args.skip_rowwise else [("insert", lambda: row_by_row(conn, data, tag))]
+            runs += [(m, lambda m=m: bulk_insert_terms(conn, data, tag, batch_size=args.batch_size, method=m))
+                     for m in ("values", "copy")]
+            for label, fn in runs:
+                st = fn()
+                print(f"{label:7}: {st['rows']} rows in {st['seconds']:.2f} s ({st['rows_per_sec']:.0f} rows/s)")
+            with conn.cursor() as cur:
+                cur.execute("SELECT definition, rules FROM structured_terms WHERE source_file = %s AND term = %s LIMIT 1",
+                            (tag, data[0]["term"]))
+                definition, rules = cur.fetchone()
+            if definition != data[0]["definition"] or rules != data[0]["rules"]:
+                sys.exit("[ERROR] round-trip mismatch")
+            print("round-trip: ok")
+        finally:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM structured_terms WHERE source_file = %s", (tag,))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+canon_hanja benchmark: per-key str.replace (legacy) vs compiled single-pass matcher.
+
+  python scripts/bench_canon_hanja.py                 # synthetic ~8MB book
+  python scripts/bench_canon_hanja.py --grow 2000     # + 2000 synthetic variant keys
+  python scripts/bench_canon_hanja.py --input book.txt --repeat 5
+"""
+import argparse, random, sys, time, unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from normalization import hanja_norm  # noqa: E402
+
+def synthetic_book(mb: float, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = ["재성이 강하면", "관살이", "인성을", "경우에는", "천간과", "지지가", "제압한다.",
+             "허투되면", "없으면", "일간은", "세력이", "\n", "　",
+             "合", "沖", "破", "穿", "墓", "庫", "禄", "祿", "国", "冲", "带象", "录", "財"]
+    out, size, target = [], 0, int(mb * 1024 * 1024)
+    while size < target:
+        w = rnd.choice(words)
+        out.append(w)
+        size += len(w.encode("utf-8")) + 1
+    return " ".join(out)
+
+def grow_map(n: int):
+    # mimic a map grown by scripts/hanja_maps.py --add: rare CJK Ext-A variants
+    for i in range(n):
+        hanja_norm.VAR[chr(0x3400 + i)] = chr(0x4E00 + i)
+
+def legacy(text: str) -> str:
+    t = unicodedata.normalize("NFKC", text)
+    return hanja_norm._replace_sequential(t, hanja_norm.VAR)
+
+def best_of(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark canon_hanja")
+    ap.add_argument("--input", help="UTF-8 text file (default: synthetic book)")
+    ap.add_argument("--mb", type=float, default=8.0, help="synthetic book size in MB")
+    ap.add_argument("--grow", type=int, default=0, help="add N synthetic variant keys")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    grow_map(args.grow)
+
+    if args.input:
+        text = Path(args.input).read_text(encoding="utf-8", errors="ignore")
+    else:
+        text = synthetic_book(args.mb)
+    mb = len(text.encode("utf-8")) / 1024 / 1024
+
+    t0 = time.perf_counter()
+    hanja_norm.variant_matcher()
+    build = time.perf_counter() - t0
+
+    t_old, out_old = best_of(legacy, text, args.repeat)
+    t_new, out_new = best_of(hanja_norm.canon_hanja, text, args.repeat)
+
+    print(f"text: {mb:.1f} MB, variant keys: {len(hanja_norm.VAR)}")
+    print(f"compile : {build*1000:8.2f} ms (once per map version)")
+    print(f"legacy  : {t_old*1000:8.1f} ms  ({mb/t_old:.1f} MB/s)")
+    print(f"compiled: {t_new*1000:8.1f} ms  ({mb/t_new:.1f} MB/s)")
+    print(f"speedup : {t_old/t_new:.2f}x")
+    if out_old != out_new:
+        sys.exit("[ERROR] output mismatch between legacy and compiled matcher")
+    print("output  : identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rule engine benchmark: RuleEngine.evaluate per chart vs evaluate_batch (NumPy).
+
+  python scripts/bench_rule_engine.py                     # 20k rules x 5k charts
+  python scripts/bench_rule_engine.py --rules 50000 --charts 20000
+"""
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from rule_engine import RuleEngine, parse_condition  # noqa: E402
+
+SUBJECTS = ["비견", "겁재", "식신", "상관", "편재", "정재", "편관", "정관", "편인", "정인",
+            "재성", "관성", "인성", "식상", "비겁"]
+STATES = {"강하": "strong", "약하": "weak", "있으": "has", "투출하": "has_gan",
+          "통근하": "rooted", "공망이": "gongmang"}
+POSITIONS = ["연간", "연지", "월간", "월지", "일지", "시간", "시지"]
+RELS = {"합": "hap", "충": "chung", "형": "hyeong"}
+
+def synthetic_rules(n: int, rnd: random.Random):
+    def part(subj):
+        kind = rnd.random()
+        if kind < 0.6:
+            return f"{subj}이 {rnd.choice(list(STATES))}"
+        if kind < 0.8:
+            return f"{subj}이 {rnd.choice(POSITIONS)}에 있으"
+        if kind < 0.9:
+            return f"{subj}이 {rnd.choice(SUBJECTS)}과 {rnd.choice(list(RELS))}하"
+        return f"{subj}이 없으"
+    rules = []
+    for i in range(n):
+        parts = [part(rnd.choice(SUBJECTS)) for _ in range(rnd.randint(1, 3))]
+        cond = "고 ".join(parts) + "면"
+        if rnd.random() < 0.1:
+            cond = f"{part(rnd.choice(SUBJECTS))}거나 {cond}"
+        rules.append({"id": i + 1, "condition": cond, "result": f"결과 {i + 1}"})
+    return rules
+
+def synthetic_charts(n: int, vocab, rnd: random.Random, density: float):
+    k = max(1, int(len(vocab) * density))
+    return [set(rnd.sample(vocab, k)) for _ in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark batch rule evaluation")
+    ap.add_argument("--rules", type=int, default=20000)
+    ap.add_argument("--charts", type=int, default=5000)
+    ap.add_argument("--density", type=float, default=0.08, help="share of predicates true per chart")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    rules = synthetic_rules(args.rules, rnd)
+    t0 = time.perf_counter()
+    engine = RuleEngine(rules)
+    vocab = sorted({k for r in rules for clause in (parse_condition(r["condition"]) or []) for k, _ in clause})
+    print(f"compile : {time.perf_counter() - t0:8.2f} s  ({len(rules)} rules, {len(engine.unparsed)} unparsed, "
+          f"{len(vocab)} predicates)")
+    charts = synthetic_charts(args.charts, vocab, rnd, args.density)
+
+    t0 = time.perf_counter()
+    per_chart = [[f["rule_index"] for f in engine.evaluate(c)] for c in charts]
+    t_loop = time.perf_counter() - t0
+    print(f"per-chart: {t_loop:8.2f} s  ({args.charts / t_loop:8.0f} charts/s)")
+
+    t0 = time.perf_counter()
+    fired = engine.evaluate_batch(charts)
+    t_batch = time.perf_counter() - t0
+    print(f"batch    : {t_batch:8.2f} s  ({args.charts / t_batch:8.0f} charts/s, {t_loop / t_batch:.1f}x)")
+
+    total = sum(len(p) for p in per_chart)
+    if [list(row.nonzero()[0]) for row in fired] != per_chart:
+        sys.exit("[ERROR] batch and per-chart results differ")
+    print(f"output   : identical ({total} firings, {total / args.charts:.1f} per chart)")
+
+if __name__ == "__main__":
+    main()
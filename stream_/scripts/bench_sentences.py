@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sentence splitter benchmark: yield_sentences (whole text) vs iter_sentences (chunks).
+
+  python scripts/bench_sentences.py                   # synthetic ~32MB text
+  python scripts/bench_sentences.py --input book.txt --chunk 65536
+"""
+import argparse, random, sys, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from file_parser import iter_sentences, yield_sentences  # noqa: E402
+
+def synthetic_text(mb: float, seed: int = 11) -> str:
+    rnd = random.Random(seed)
+    words = ["재성이", "강하면", "관이", "약해진다.", "인성을", "보면", "그렇다", "경우에는",
+             "합이", "되면", "묶인다!", "왜 그런가?", "살아남음", "\n", "\n\n", "일간은", "함"]
+    out, size, target = [], 0, int(mb * 1024 * 1024)
+    while size < target:
+        w = rnd.choice(words)
+        out.append(w)
+        size += len(w.encode("utf-8")) + 1
+    return " ".join(out)
+
+def chunked(text: str, n: int):
+    for i in range(0, len(text), n):
+        yield text[i:i + n]
+
+def run(label, make_iter):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    it = make_iter()
+    first = None
+    count = 0
+    for _ in it:
+        if first is None:
+            first = time.perf_counter() - t0
+        count += 1
+    total = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:8}: {total*1000:8.1f} ms total, first sentence after {first*1000:8.3f} ms, "
+          f"peak +{peak/1024/1024:6.1f} MB, {count} sentences")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark sentence splitting")
+    ap.add_argument("--input", help="UTF-8 text file (default: synthetic text)")
+    ap.add_argument("--mb", type=float, default=32.0, help="synthetic text size in MB")
+    ap.add_argument("--chunk", type=int, default=1 << 16, help="chunk size (characters)")
+    args = ap.parse_args()
+
+    if args.input:
+        text = Path(args.input).read_text(encoding="utf-8", errors="ignore")
+    else:
+        text = synthetic_text(args.mb)
+    print(f"text: {len(text.encode('utf-8'))/1024/1024:.1f} MB, chunk: {args.chunk} chars")
+
+    run("whole", lambda: yield_sentences(text))
+    run("chunked", lambda: iter_sentences(chunked(text, args.chunk)))
+    if list(yield_sentences(text)) != list(iter_sentences(chunked(text, args.chunk))):
+        sys.exit("[ERROR] sentence mismatch between splitters")
+    print("output  : identical")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import json, argparse
+import json, argparse, sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from normalization.hanja_norm import SNAPSHOT_PATH, write_snapshot  # noqa: E402
+
 RES = Path(__file__).resolve().parents[1] / "resources"
 VPATH = RES / "hanja_variant_map.json"
 RPATH = RES / "hanja_reading_map.json"
@@ -12,6 +15,7 @@ def main():
     ap.add_argument("--show", action="store_true", help="Print current maps (head)")
     ap.add_argument("--add", nargs=2, metavar=("VARIANT","CANON"), help="Add/override variant→canon mapping")
     ap.add_argument("--reading", nargs=2, metavar=("HANJA","READING"), help="Append reading to hanja")
+    ap.add_argument("--compile", action="store_true", help="Write the binary snapshot (done after every change)")
     args = ap.parse_args()
 
     VAR = json.loads(VPATH.read_text(encoding="utf-8"))
@@ -31,7 +35,7 @@ def main():
             changed = True
             print(f"[+] reading: {h} += {rd}")
 
-    if args.show or not changed:
+    if args.show or not (changed or args.compile):
         print("== Variant map (first 20) ==")
         for i, (k, v) in enumerate(list(VAR.items())[:20]):
             print(f"{k} -> {v}")
@@ -43,6 +47,9 @@ def main():
         VPATH.write_text(json.dumps(VAR, ensure_ascii=False, indent=2), encoding="utf-8")
         RPATH.write_text(json.dumps(READ, ensure_ascii=False, indent=2), encoding="utf-8")
         print("Saved.")
+    if changed or args.compile:
+        header = write_snapshot()
+        print(f"Snapshot: {SNAPSHOT_PATH.name} (maps_version {header['maps_version']})")
 
 if __name__ == "__main__":
     main()
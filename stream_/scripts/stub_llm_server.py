@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the chat completions API, for exercising async_extractor.
+
+Answers POST /v1/chat/completions with {"rules": [...]} built by the
+placeholder heuristic in gpt_extractor_v2, optionally slow or flaky:
+
+  python scripts/stub_llm_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+  python -m stream_.run_pipeline --llm-base-url http://127.0.0.1:8765/v1 ...
+"""
+import argparse, json, random, re, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gpt_extractor_v2 import extract_rule_advanced  # noqa: E402
+
+_LINE = re.compile(r"^(\d+)\. (.*)$")
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_rate = 0.0
+    calls = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body, headers=()):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        Handler.calls += 1
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            return self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                              [("Retry-After", "0.05")])
+        user = next(m["content"] for m in req["messages"] if m["role"] == "user")
+        rules = []
+        for line in user.splitlines():
+            m = _LINE.match(line)
+            if m:
+                r = json.loads(extract_rule_advanced(m.group(2)))
+                rules.append({"i": int(m.group(1)), "if": r["if"], "then": r["then"],
+                              "confidence": r["confidence"]})
+        content = json.dumps({"rules": rules}, ensure_ascii=False)
+        self._send(200, {
+            "id": f"stub-{Handler.calls}", "object": "chat.completion", "created": int(time.time()),
+            "model": req.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+def serve(host="127.0.0.1", port=8765, latency=0.0, fail_rate=0.0):
+    Handler.latency, Handler.fail_rate = latency, fail_rate
+    return ThreadingHTTPServer((host, port), Handler)
+
+def main():
+    ap = argparse.ArgumentParser(description="Stub chat completions server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 429")
+    args = ap.parse_args()
+    srv = serve(args.host, args.port, args.latency, args.fail_rate)
+    print(f"stub LLM on http://{args.host}:{args.port}/v1")
+    srv.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming output sinks for extracted rules.
+
+open_sink(path) picks the writer from the extension:
+  .jsonl / .ndjson          one JSON object per line
+  .jsonl.gz / .ndjson.gz    the same, gzip-compressed (one gzip member per batch)
+  .json                     JSON array (same text as json.dump(indent=2))
+  .parquet                  Parquet with row groups of ``row_group_rows`` (pyarrow)
+  .arrow / .feather         Arrow IPC file, same buffering (pyarrow)
+
+Text sinks have every batch on disk as soon as write(records) returns; the
+columnar sinks buffer up to one row group (the checkpoint still holds those
+rows), so a crash never loses more than that.
+
+Appendable sinks (``appendable = True``: the JSONL ones) can be reopened at a
+size recorded earlier with open_sink(path, append_at=size): anything after it
+is cut off and new batches are appended, so a resumed run neither rewrites
+nor re-reads the output.  size() is the file size after the last write.
+"""
+import abc, gzip, json, os, shutil
+from typing import Iterable, List
+
+class JsonlSink:
+    appendable = True
+
+    def __init__(self, path: str, append_at: int = None):
+        self.path = path
+        self.count = 0
+        if append_at is not None and os.path.exists(path):
+            with open(path, "r+b") as f:
+                f.truncate(append_at)
+        self._f = self._open(path, "w" if append_at is None else "a")
+
+    def _open(self, path, mode):
+        return open(path, mode, encoding="utf-8")
+
+    def write(self, records: Iterable[dict]):
+        for r in records:
+            self._f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            self.count += 1
+        self.flush()
+
+    def flush(self):
+        self._f.flush()
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class GzipJsonlSink(JsonlSink):
+    # every batch is a complete gzip member, so the file is valid after each
+    # write and can be cut at a batch boundary and appended to
+    def _open(self, path, mode):
+        return open(path, mode + "b")
+
+    def write(self, records: Iterable[dict]):
+        lines = []
+        for r in records:
+            lines.append(json.dumps(r, ensure_ascii=False) + "\n")
+        if lines:
+            self._f.write(gzip.compress("".join(lines).encode("utf-8"), compresslevel=6))
+            self.count += len(lines)
+        self.flush()
+
+class JsonArraySink(JsonlSink):
+    appendable = False
+
+    def write(self, records: Iterable[dict]):
+        for r in records:
+            body = json.dumps(r, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self._f.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+            self.count += 1
+        self.flush()
+
+    def close(self):
+        self._f.write("\n]" if self.count else "[]")
+        self._f.close()
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except Exception as e:
+        raise RuntimeError("pyarrow 미설치: pip install pyarrow") from e
+    return pa
+
+class _ArrowSink(abc.ABC):
+    """
+    Each row group is spilled to <path>.parts/ with the schema inferred for
+    it; close() unifies the schemas (keys that first appear later become new
+    columns, all-null columns take the type seen elsewhere) and writes the
+    final file one row group at a time.
+    """
+    appendable = False
+
+    def __init__(self, path: str, row_group_rows: int = 8192):
+        self.path = path
+        self.count = 0
+        self.row_group_rows = row_group_rows
+        self.schema = None
+        self._rows: List[dict] = []
+        self._parts: List[str] = []
+        self._parts_dir = path + ".parts"
+        self._pa = _pyarrow()
+
+    @abc.abstractmethod
+    def _open_writer(self, schema):
+        """Writer for the final file with ``write_table`` and ``close``."""
+
+    def write(self, records: Iterable[dict]):
+        for r in records:
+            self._rows.append(r)
+            self.count += 1
+        if len(self._rows) >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        pa = self._pa
+        table = pa.Table.from_pylist(self._rows)
+        os.makedirs(self._parts_dir, exist_ok=True)
+        part = os.path.join(self._parts_dir, f"{len(self._parts):06d}.arrow")
+        with pa.ipc.new_file(part, table.schema) as w:
+            w.write_table(table)
+        self._parts.append(part)
+        self._rows = []
+
+    def _conform(self, table):
+        pa = self._pa
+        cols = []
+        for field in self.schema:
+            if field.name in table.column_names:
+                cols.append(table.column(field.name).cast(field.type))
+            else:
+                cols.append(pa.nulls(table.num_rows, field.type))
+        return pa.Table.from_arrays(cols, schema=self.schema)
+
+    def close(self):
+        self.flush()
+        pa = self._pa
+        try:
+            if not self._parts:
+                if not os.path.exists(self.path):
+                    open(self.path, "wb").close()
+                return
+            tables = [pa.ipc.open_file(p) for p in self._parts]
+            self.schema = pa.unify_schemas([t.schema for t in tables], promote_options="permissive")
+            writer = self._open_writer(self.schema)
+            try:
+                for t in tables:
+                    writer.write_table(self._conform(t.read_all()))
+            finally:
+                writer.close()
+        finally:
+            shutil.rmtree(self._parts_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParquetSink(_ArrowSink):
+    def _open_writer(self, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, schema)
+
+class ArrowSink(_ArrowSink):
+    def _open_writer(self, schema):
+        return self._pa.ipc.new_file(self.path, schema)
+
+_SINKS = [
+    ((".jsonl.gz", ".ndjson.gz"), GzipJsonlSink),
+    ((".jsonl", ".ndjson"), JsonlSink),
+    ((".json",), JsonArraySink),
+    ((".parquet",), ParquetSink),
+    ((".arrow", ".feather"), ArrowSink),
+]
+
+def sink_class(path: str):
+    low = path.lower()
+    for exts, cls in _SINKS:
+        if low.endswith(exts):
+            return cls
+    raise ValueError(f"지원하지 않는 출력 형식: {path}")
+
+def open_sink(path: str, append_at: int = None):
+    """``append_at``: reopen an appendable sink at that size instead of starting over."""
+    cls = sink_class(path)
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    if append_at is not None:
+        if not cls.appendable:
+            raise ValueError(f"이어 쓸 수 없는 출력 형식: {path}")
+        return cls(path, append_at=append_at)
+    return cls(path)
+
+def iter_jsonl(path: str) -> Iterable[dict]:
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
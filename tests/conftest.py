@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# stream_ modules import each other absolutely (normalization.*, rule_engine, ...)
+for p in (ROOT, ROOT / "stream_", ROOT / "project-root"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
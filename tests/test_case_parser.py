@@ -0,0 +1,55 @@
+"""The single-pass tokenizer must give what the original regexes gave."""
+import io
+import random
+import re
+
+import pytest
+
+from modules.case_parser import parse_cases, parse_cases_file
+
+
+def legacy_parse_cases(text):
+    # the regex implementation parse_cases replaced, verbatim
+    results = []
+    for i, block in enumerate(re.findall(r"<사례.*?>.*?(?=<사례|\Z)", text, flags=re.DOTALL), 1):
+        results.append({"id": f"case_{i}", "type": "사례", "content": block.strip()})
+    for i, (cond, res) in enumerate(re.findall(r"(.+?)\s*→\s*(.+)", text), 1):
+        results.append({"id": f"rule_{i}", "type": "규칙", "condition": cond.strip(), "result": res.strip()})
+    return results
+
+
+CASES = [
+    "",
+    "규칙 없음",
+    "재성이 강하면 → 관이 약해진다",
+    "<사례 1>\n갑목 일간\n재성이 강하면 → 관이 약해진다\n<사례 2>내용 → 결과\n끝",
+    "<사례>첫 줄\n\n<사례 >",
+    "조건 →\n\n\n결과",          # whitespace around the arrow spans blank lines
+    "조건\n   → 결과 → 또",
+    "→ 결과만",
+    "조건만 →",
+    "<사례 a>b<사례>c<사례",
+    "a → b\r\nc → d\n",
+]
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_matches_legacy_regexes(text):
+    assert parse_cases(text) == legacy_parse_cases(text)
+
+
+def test_random_texts_match_legacy():
+    rnd = random.Random(21)
+    pieces = ["<사례", "<사례 1>", ">", "→", " → ", "\n", "\n\n", " ", "조건", "결과", "a", "<", "\t"]
+    for _ in range(2000):
+        text = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 20)))
+        assert parse_cases(text) == legacy_parse_cases(text), repr(text)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+def test_file_chunks_match_legacy(chunk_size, tmp_path):
+    text = "\n".join(CASES) * 3
+    path = tmp_path / "book.txt"
+    path.write_text(text, encoding="utf-8")
+    # compare with the text as read back (text mode turns \r\n into \n)
+    assert parse_cases_file(str(path), chunk_size=chunk_size) == legacy_parse_cases(path.read_text(encoding="utf-8"))
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+pytest.importorskip("psycopg2")
+import db  # noqa: E402
+
+
+class _Cursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.log.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+
+class _Conn:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, **kw):
+        return _Cursor(self.log)
+
+
+def test_free_text_rule_search_is_substring():
+    conn = _Conn()
+    db.find_terms(conn, rule_text="재성_강%")
+    sql, params = conn.log[0]
+    assert "rules::text ILIKE %s" in sql
+    assert params[0] == "%재성\\_강\\%%"
+
+
+def test_json_rule_fragment_is_containment():
+    conn = _Conn()
+    db.find_terms(conn, rules={"if": "재성이 강하면"})
+    sql, params = conn.log[0]
+    assert "rules @> %s::jsonb" in sql
+    assert json.loads(params[0]) == [{"if": "재성이 강하면"}]
@@ -0,0 +1,70 @@
+import pytest
+
+from conftest import ROOT
+
+
+def test_build_context_copies_are_identical():
+    a = (ROOT / "stream_" / "db_pool.py").read_bytes()
+    b = (ROOT / "project-root" / "streamlit_app" / "db_pool.py").read_bytes()
+    assert a == b
+
+
+class _Conn:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = 0
+        self.autocommit = False
+
+    def cursor(self):
+        conn = self
+
+        class _Cur:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                import psycopg2
+                if not conn.alive:
+                    raise psycopg2.OperationalError("server closed the connection")
+
+        return _Cur()
+
+    def rollback(self):
+        pass
+
+
+class _FakePgPool:
+    """Idle connections in ``_pool``; new ones are opened when it is empty."""
+
+    def __init__(self, minconn, maxconn, dsn, **kw):
+        self._pool, self._used = [], {}
+
+    def getconn(self):
+        conn = self._pool.pop() if self._pool else _Conn()
+        self._used[id(conn)] = conn
+        return conn
+
+    def putconn(self, conn, close=False):
+        self._used.pop(id(conn), None)
+        if close:
+            conn.closed = 1
+        else:
+            self._pool.append(conn)
+
+
+def test_dead_idle_connections_are_all_replaced(monkeypatch):
+    pytest.importorskip("psycopg2")
+    import db_pool
+
+    monkeypatch.setattr(db_pool.pg_pool, "ThreadedConnectionPool", _FakePgPool)
+    pool = db_pool.ConnectionPool("dbname=x", minconn=1, maxconn=4, check_after=0)
+    pool._pool._pool = [_Conn(alive=False) for _ in range(4)]  # server restarted
+
+    conn = pool.getconn()
+    assert conn.alive and not conn.closed
+    assert pool.reconnects == 4
+    pool.putconn(conn)
+    assert pool.stats()["in_use"] == 0
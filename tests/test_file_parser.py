@@ -0,0 +1,33 @@
+"""iter_sentences over chunks must yield exactly yield_sentences over the joined text."""
+import random
+
+import pytest
+
+from file_parser import iter_sentences, yield_sentences
+
+WORDS = ["재성이", "강하면", "관이", "약해진다.", "인성을", "보면", "그렇다", "경우에는", "합이", "되면",
+         "묶인다!", "왜 그런가?", "살아남음", "\n", "\n\n", "일간은", "함", "  ", "다", "a"]
+
+
+def _text(seed, n=400):
+    rnd = random.Random(seed)
+    return " ".join(rnd.choice(WORDS) for _ in range(n))
+
+
+def _chunked(text, n):
+    return (text[i:i + n] for i in range(0, len(text), n))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("seed", range(5))
+def test_chunked_equals_whole_text(seed, size):
+    text = _text(seed)
+    assert list(iter_sentences(_chunked(text, size))) == list(yield_sentences(text))
+
+
+@pytest.mark.parametrize("text", ["", " ", "다", "한 문장이다. ", "끝이 없는 문장", "다 \n\n 요 음 함. 끝!",
+                                  "공백이 청크 경계에 걸린다.   \n   다음 문장이다."])
+def test_edge_cases(text):
+    for size in (1, 2, 5):
+        assert list(iter_sentences(_chunked(text, size))) == list(yield_sentences(text))
+    assert list(iter_sentences(["", text, ""])) == list(yield_sentences(text))
@@ -0,0 +1,48 @@
+"""The compiled variant matcher (trie regex) must equal sequential str.replace."""
+import random
+
+import pytest
+
+from normalization import hanja_norm
+from normalization.trie import trie_pattern
+
+# chains (A->B->C), keys inside other keys and targets, identity entries, phrases
+SYNTHETIC = {"A": "B", "B": "C", "AB": "X", "ABC": "Y", "C": "C", "XY": "Z",
+             "甲乙": "丙", "乙": "甲", "丙丁": "乙乙", "丁": "戊", "戊": "丁",
+             "P": "Q", "Q": "R", "R": "S", "S": "T"}
+
+
+def _texts(keys, n=300, seed=3):
+    rnd = random.Random(seed)
+    alphabet = list({ch for k in keys for ch in k}) + [" ", "가", "\n"]
+    for _ in range(n):
+        yield "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 24)))
+
+
+@pytest.fixture
+def scan_always(monkeypatch):
+    # small maps normally use ordered replace passes; force the single regex scan
+    monkeypatch.setattr(hanja_norm, "_SCAN_MIN_KEYS", 0)
+
+
+@pytest.mark.parametrize("var", [SYNTHETIC, {"A": "AB", "B": "A"}, {"ab": "b", "b": "ab", "a": "c"}])
+def test_matcher_equals_sequential_replace(var, scan_always):
+    m = hanja_norm.VariantMatcher(var)
+    for t in _texts(var):
+        assert m.sub(t) == hanja_norm._replace_sequential(t, var), t
+
+
+def test_real_map_equals_sequential_replace():
+    var = hanja_norm._maps("VAR")
+    m = hanja_norm.VariantMatcher(var)
+    rnd = random.Random(5)
+    pool = list(var) + list(var.values()) + ["가", " ", "祿", "福"]
+    for _ in range(200):
+        t = "".join(rnd.choice(pool) for _ in range(rnd.randint(0, 30)))
+        assert m.sub(t) == hanja_norm._replace_sequential(t, var)
+
+
+def test_trie_pattern_prefers_longest_key():
+    import re
+    pat = re.compile(trie_pattern(["a", "ab", "abc", "b", "x.y"]))
+    assert pat.findall("abcabxabx.yb") == ["abc", "ab", "ab", "x.y", "b"]
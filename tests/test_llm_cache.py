@@ -0,0 +1,25 @@
+from conftest import ROOT
+
+
+def test_container_copies_are_identical():
+    a = (ROOT / "stream_" / "llm_cache.py").read_bytes()
+    b = (ROOT / "project-root" / "backend" / "analysis" / "llm_cache.py").read_bytes()
+    assert a == b
+
+
+def test_failed_compute_is_not_cached(tmp_path):
+    from llm_cache import LLMCache
+
+    cache = LLMCache(str(tmp_path / "c.sqlite3"))
+
+    def bad():
+        raise ValueError("unparseable")
+
+    for _ in range(2):
+        try:
+            cache.cached("p", bad, model="m")
+        except ValueError:
+            pass
+    assert cache.stats()["entries"] == 0
+    assert cache.cached("p", lambda: "ok", model="m") == "ok"
+    assert cache.cached("p", lambda: "other", model="m") == "ok"
@@ -0,0 +1,73 @@
+import importlib.util
+
+import pytest
+
+from conftest import ROOT
+
+
+def _legacy_wrapper():
+    spec = importlib.util.spec_from_file_location("rule_engine_1", ROOT / "stream_" / "1. rule_engine.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.mark.parametrize("value, fires", [(True, True), (2, True), ("yes", True), (0, False), (None, False)])
+def test_evaluate_rule_keeps_baseline_truthiness(value, fires):
+    evaluate_rule = _legacy_wrapper().evaluate_rule
+    rule = {"condition": "재성이 강하면", "result": "R"}
+    assert evaluate_rule(rule, {'has_gan("재성")': value}) == ("R" if fires else "조건 불충족")
+
+
+@pytest.mark.parametrize("text, clauses", [
+    ("재성이 강하면", [[('strong("재성")', True)]]),
+    ("재성이 강하고 관성이 약하면", [[('strong("재성")', True), ('weak("관성")', True)]]),
+    ("정인이 일지와 합이 되면", [[('hap("일지","정인")', True)]]),
+    ("정인이 없거나 관성이 많을 때", [[('has("정인")', False)], [('strong("관성")', True)]]),
+    ("식신이 재성을 생하면", [[('saeng("식신","재성")', True)]]),
+    # phrasings the keyword filter lets through ("보면", "되면")
+    ("인성을 보면", [[('has("인성")', True)]]),
+    ("식신을 만나면", [[('has("식신")', True)]]),
+    ("편관이 보이지 않으면", [[('has("편관")', False)]]),
+    ("관성을 보고 인성이 있으면", [[('has("관성")', True), ('has("인성")', True)]]),
+    ("합이 되면", [[("hap()", True)]]),
+    ("재성이 강하고 충이 되면", [[('strong("재성")', True), ("chung()", True)]]),
+])
+def test_parse_condition(text, clauses):
+    from rule_engine import parse_condition
+    assert parse_condition(text) == clauses
+
+
+def test_bare_relation_fires_on_any_pair():
+    from rule_engine import RuleEngine
+    engine = RuleEngine([{"condition": "합이 되면", "result": "H"}])
+    assert [f["result"] for f in engine.evaluate({'hap("관성","재성")': True})] == ["H"]
+    assert engine.evaluate({'chung("관성","재성")': True}) == []
+
+
+def test_unparsed_rules_are_logged(caplog):
+    from rule_engine import RuleEngine
+    with caplog.at_level("WARNING", logger="rule_engine"):
+        engine = RuleEngine([{"id": 9, "condition": "알 수 없는 문장", "result": "?"}])
+    assert engine.unparsed == [0]
+    assert "id=9" in caplog.text
+
+
+def test_batch_matches_per_chart():
+    # the cases scripts/bench_rule_engine.py checks, at test size
+    pytest.importorskip("numpy")
+    import random
+    import sys
+    sys.path.insert(0, str(ROOT / "stream_" / "scripts"))
+    from bench_rule_engine import synthetic_charts, synthetic_rules
+    from rule_engine import RuleEngine, parse_condition
+
+    rnd = random.Random(7)
+    rules = synthetic_rules(800, rnd)
+    engine = RuleEngine(rules)
+    assert engine.unparsed == []
+    vocab = sorted({k for r in rules for clause in parse_condition(r["condition"]) for k, _ in clause})
+    charts = synthetic_charts(300, vocab, rnd, 0.08)
+    fired = engine.evaluate_batch(charts, max_cells=1 << 16)  # several slices
+    assert [list(row.nonzero()[0]) for row in fired] == \
+        [[f["rule_index"] for f in engine.evaluate(c)] for c in charts]
@@ -0,0 +1,44 @@
+import importlib.util
+
+from conftest import ROOT
+from rule_store import SEED_RULES, RuleStore
+
+
+def _load_rules_module():
+    spec = importlib.util.spec_from_file_location("load_rules", ROOT / "project-root" / "scripts" / "load_rules.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def test_new_store_is_empty_unless_seeded(tmp_path):
+    assert RuleStore(str(tmp_path / "a.sqlite3")).count() == 0
+    assert RuleStore(str(tmp_path / "b.sqlite3"), seed=SEED_RULES).count() == len(SEED_RULES)
+
+
+def test_add_many_numbers_rules_without_id(tmp_path):
+    store = RuleStore(str(tmp_path / "r.sqlite3"))
+    assert store.add_many([{"id": 1, "condition": "a", "action": "x"}]) == []
+    batch = [{"id": None, "condition": "b", "action": "y"}, {"id": 7, "condition": "c", "action": "z"},
+             {"id": None, "condition": "d", "action": "w"}]
+    assert store.add_many(batch) == []
+    assert [r["id"] for r in batch] == [8, 7, 9]
+    assert [r["id"] for r in store.list()] == [1, 7, 8, 9]
+
+
+def test_add_many_conflicts_skip_unnumbered_rules(tmp_path):
+    store = RuleStore(str(tmp_path / "r.sqlite3"))
+    store.add_many([{"id": 1, "condition": "a", "action": "x"}])
+    batch = [{"id": None, "condition": "b", "action": "y"}, {"id": 1, "condition": "c", "action": "z"}]
+    assert store.add_many(batch) == [{"index": 1, "id": 1, "error": "id exists"}]
+    assert batch[0]["id"] is None and store.count() == 1
+
+
+def test_load_rules_skips_cases_and_drops_string_ids():
+    lr = _load_rules_module()
+    records = [{"id": "case_1", "type": "사례", "content": "..."},
+               {"id": "rule_1", "type": "규칙", "condition": "c", "result": "r"},
+               {"id": 5, "if": "i", "then": "t"}]
+    assert list(lr.to_rules(records)) == [{"condition": "c", "action": "r"},
+                                          {"id": 5, "condition": "i", "action": "t"}]
+    assert all("id" not in r for r in lr.to_rules(records, keep_ids=False))